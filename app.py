@@ -1,30 +1,140 @@
 import sys
 import os
-import json
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QPushButton, QInputDialog, QMessageBox, QComboBox, QDesktopWidget, QDialog, QLabel, QDialogButtonBox
-from PyQt5.QtCore import QTimer, QTime, QDate, Qt
-from course_widget import CourseWidget  # 导入CourseWidget
+from collections import OrderedDict
+from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QMessageBox, QComboBox, QStackedWidget, QCheckBox, QMenu, QUndoStack
+from PyQt5.QtGui import QKeySequence
+from PyQt5.QtCore import QTimer, Qt
+from day_page import DayPage
+from course_record import CourseRecord
+from course_editors import CourseEditor, DayOrganizer, CopyDayDialog, SwapDayDialog, ReplaceDialog, WEEKDAY_NAMES
+from schedule_edit import ScheduleEdit, reorderDay, removeCourses, copyDay, replaceName
+from week_grid import WeekGridView
+from schedule_store import ScheduleStore
+from storage import readBackendOptions
+from schedule_sync import ScheduleSync
+from highlight_scheduler import HighlightScheduler
+from schedule_index import parseTimeRange, formatMinutes, TimeFormatError
+from layout_metrics import layoutMetrics
+from io_worker import ioWorker
+from file_watcher import fileWatcher
+from instrumentation import instrumented, installDiagnostics
 
 class CourseScheduleApp(QWidget):
-    def __init__(self):
+    # 缓存页面的课程组件总数上限，超过时淘汰最久未查看的页面
+    MAX_CACHED_ROWS = 200
+    # 星期下拉框中整周总览的位置
+    WEEK_VIEW_INDEX = 7
+    # 后台读取 change.txt 的超时时间，超时后保持当前模式
+    IO_TIMEOUT_MS = 2000
+
+    def __init__(self, clock=None, profile=None, data_dir='.', host=None):
         super().__init__()
+        # 启动分析器，只在 --profile-startup 时传入
+        self.profile = profile
+        self._startup_done = False
+        # 课表文件和 change.txt 所在目录；由 ScheduleHost 创建时与其他窗口共用调度器
+        self.data_dir = os.path.abspath(data_dir)
+        self.mode_path = os.path.join(self.data_dir, 'change.txt')
+        self.host = host
+        # 运行期间的零散文件读写交给后台线程，结果通过信号送回
+        self.io = ioWorker()
+        self.io.finished.connect(self.onIoFinished)
+        # change.txt 上次读取时的状态，目录中其他文件变化时不重新读取
+        self._mode_stamp = self._modeStamp()
         self.show_delete_button = self.check_delete_button_status()
-        
+        self._mark('config read')
+
+        # 课表数据只加载一次，文件变化时由存储层通知
+        # 存在 courses.db 时使用 SQLite 存储，否则使用 courses.json
+        schedule_path = os.path.join(self.data_dir, 'courses.db')
+        if not os.path.exists(schedule_path):
+            schedule_path = os.path.join(self.data_dir, 'courses.json')
+        # SQLite 中的班级和学期由同一目录下的 schedule.txt 选择
+        backend_options = readBackendOptions(os.path.join(self.data_dir, 'schedule.txt'))
+        self.store = ScheduleStore(schedule_path, self, **backend_options)
+        self.store.scheduleChanged.connect(self.onScheduleChanged)
+        # 退出前写入尚未保存的修改
+        QApplication.instance().aboutToQuit.connect(self.store.flush)
+
+        # 每次修改（包括批量修改）是一个撤销步骤；编辑对话框首次使用时创建并缓存
+        self.undo_stack = QUndoStack(self)
+        self._editors = {}
+
+        # 目录中有 sync.txt 时从其中的地址同步课表，本地课表文件作为离线缓存
+        self.sync = None
+        sync_url = self._readText(os.path.join(self.data_dir, 'sync.txt'))
+        if sync_url and sync_url.strip():
+            try:
+                self.sync = ScheduleSync(sync_url.strip(), self.store, self)
+            except ValueError as e:
+                print(f"读取sync.txt时发生错误: {e}")
+        
+        # 屏幕尺寸和字体由共享服务缓存，屏幕配置变化时统一更新
+        self.metrics = layoutMetrics()
+        self.metrics.metricsChanged.connect(self.onMetricsChanged)
+        self.screen_ = self.metrics.screenFor(self)
+
+        # 高亮调度器只在上下课时间点唤醒，clock 可注入用于测试
+        self.scheduler = host.scheduler if host is not None else HighlightScheduler(self, clock)
+        self.scheduler.boundaryReached.connect(self.updateCourseList)
+        self.scheduler.dayChanged.connect(self.onDayChanged)
+
         # 获取今天的星期数并初始化课程数据
-        self.today_weekday = QDate.currentDate().dayOfWeek()
+        self.today_weekday = self.scheduler.weekday()
         self.current_weekday = self.today_weekday
+        # 整周总览在首次查看时创建
+        self.week_grid = None
+        self.sort_by_time = False
         self.courses = self.loadCoursesFromFile(self.today_weekday)
+        self._mark('schedule load')
         
-        # 设置开机自启动
-        self.setup_autostart()
-        
-        # 初始化UI
+        # 初始化UI，课程组件和开机自启动检查在首次绘制之后进行
         self.initUI()
         self.moveToRightTop()
+        self._mark('ui build')
+
+        # 性能诊断，只在开启 COURSE_INSTRUMENT 时生效
+        installDiagnostics(self)
+
+    def _mark(self, phase):
+        if self.profile is not None:
+            self.profile.mark(phase)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._startup_done and not getattr(self, '_startup_scheduled', False):
+            self._startup_scheduled = True
+            self._mark('first paint')
+            QTimer.singleShot(0, self.finishStartup)
+
+    def finishStartup(self):
+        # 首次绘制后再创建课程组件、启动监视和设置开机自启动
+        if self._startup_done:
+            return
+        self._startup_done = True
+        self.showPage(self.current_weekday)
+        self.scheduler.setDayIndex(self.store.dayIndex(self.today_weekday), self)
 
+        # 监视 change.txt，切换编辑/显示模式时只更新现有组件
+        self.watcher = fileWatcher()
+        self.watcher.watch(self.mode_path, self.onModeFileChanged)
+        self.watcher.watch(self.data_dir, self.onModeFileChanged)
+        self._mark('course widgets')
+
+        # 在后台设置开机自启动
+        self.io.submit('autostart', self.setup_autostart)
+        self._mark('autostart')
+
+        # 首次同步在后台进行，期间显示本地缓存的课表
+        if self.sync is not None:
+            self.sync.start()
+        if self.profile is not None:
+            print(self.profile.report())
+
+    @instrumented('calculateWindowSize')
     def calculateWindowSize(self):
-        # 获取屏幕尺寸
-        screen = QDesktopWidget().screenGeometry()
+        # 获取窗口所在屏幕的尺寸
+        screen = self.metrics.screenGeometry(self.screen_)
         screen_height = screen.height()
         screen_width = screen.width()
         
@@ -75,12 +185,17 @@ class CourseScheduleApp(QWidget):
         # 确保窗口尺寸不小于最小值
         window_width = max(base_width, min_width)
         window_height = max(window_height, min_height)
+
+        # 整周总览需要并排显示七天
+        if self.isWeekView():
+            window_width = max(window_width, screen_width / 2)
+            window_height = max(window_height, screen_height * 0.6)
         
         return round(window_width), round(window_height)
 
     def check_delete_button_status(self):
         try:
-            with open('change.txt', 'r', encoding='utf-8') as file:
+            with open(self.mode_path, 'r', encoding='utf-8') as file:
                 content = file.read().strip()
                 return content == "1"
         except FileNotFoundError:
@@ -90,7 +205,11 @@ class CourseScheduleApp(QWidget):
             return True  # 发生错误时默认显示删除按钮
 
     def initUI(self):
-        self.setWindowTitle('桌面课表软件')
+        # 同一进程中的多个窗口在标题中显示各自的目录名
+        if self.host is not None:
+            self.setWindowTitle(f"桌面课表软件 - {os.path.basename(self.data_dir)}")
+        else:
+            self.setWindowTitle('桌面课表软件')
         
         # 设置窗口标志
         self.setWindowFlags(Qt.WindowStaysOnBottomHint | Qt.CustomizeWindowHint | Qt.Tool)
@@ -112,250 +231,405 @@ class CourseScheduleApp(QWidget):
         # 创建星期选择下拉框
         self.weekday_combo = QComboBox()
         self.weekday_combo.addItems(['星期一', '星期二', '星期三', '星期四', '星期五', '星期六', '星期日'])
+        # 最后一项为整周总览
+        self.weekday_combo.addItem('整周')
         self.weekday_combo.setCurrentIndex(self.today_weekday - 1)
         self.weekday_combo.currentIndexChanged.connect(self.onWeekdayChanged)
         layout.addWidget(self.weekday_combo)
 
-        # 创建添加课程按钮
+        # 每天的课程页首次查看时创建并缓存，切换星期只需翻页
+        self.page_stack = QStackedWidget()
+        self.pages = OrderedDict()
+        layout.addWidget(self.page_stack)
+
+        # 创建添加课程按钮，批量编辑按钮放在同一行，不增加窗口高度
         self.add_button = QPushButton('添加课程')
         self.add_button.clicked.connect(self.addCourse)
-        
+        self.bulk_button = QPushButton('批量编辑')
+        self.bulk_button.setMenu(self.createBulkMenu())
+        button_row = QHBoxLayout()
+        button_row.addWidget(self.add_button)
+        button_row.addWidget(self.bulk_button)
+        layout.addLayout(button_row)
+        
+        # 编辑模式下可以切换为按开始时间显示
+        self.sort_checkbox = QCheckBox('按时间排序')
+        self.sort_checkbox.toggled.connect(self.setSortByTime)
+        layout.addWidget(self.sort_checkbox)
+
         # 根据 show_delete_button 状态设置添加按钮的可见性
         self.add_button.setVisible(self.show_delete_button)
+        self.bulk_button.setVisible(self.show_delete_button)
+        self.sort_checkbox.setVisible(self.show_delete_button)
+
+    def createBulkMenu(self):
+        menu = QMenu(self)
+        menu.addAction('整理当天课程…', self.organizeDay)
+        menu.addAction('复制到其他星期…', self.copyDayTo)
+        menu.addAction('与其他星期交换…', self.swapDays)
+        menu.addAction('查找替换课程…', self.replaceSubject)
+        menu.addSeparator()
+        # 撤销和重做的快捷键只在编辑模式下对整个窗口有效，显示模式下不会误撤销修改
+        undo_action = self.undo_stack.createUndoAction(self, '撤销')
+        undo_action.setShortcut(QKeySequence.Undo)
+        redo_action = self.undo_stack.createRedoAction(self, '重做')
+        redo_action.setShortcut(QKeySequence.Redo)
+        self.undo_actions = (undo_action, redo_action)
+        for action in self.undo_actions:
+            menu.addAction(action)
+        self.setUndoShortcuts(self.show_delete_button)
+        return menu
+
+    def setUndoShortcuts(self, enabled):
+        for action in self.undo_actions:
+            if enabled:
+                self.addAction(action)
+            else:
+                self.removeAction(action)
         
-        # 刷新课程组件显示
-        self.refreshCourseWidgets()
-        
-        # 设置定时器
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.updateCourseList)
-        self.timer.start(1000)
 
+    @instrumented('loadCoursesFromFile')
     def loadCoursesFromFile(self, weekday):
-        try:
-            with open('courses.json', 'r', encoding='utf-8') as file:
-                courses_data = json.load(file)
-                return courses_data.get(str(weekday), [])
-        except FileNotFoundError:
-            return []
-        except json.JSONDecodeError as e:
-            print(f"JSON解码错误: {e}")
-            return []
+        return self.store.courses(weekday)
 
+    @instrumented('saveCoursesToFile')
     def saveCoursesToFile(self):
-        try:
-            # 加载现有的课程数据
-            try:
-                with open('courses.json', 'r', encoding='utf-8') as file:
-                    courses_data = json.load(file)
-            except FileNotFoundError:
-                courses_data = {}
-            
-            # 更新当前显示星期的课程数据
-            courses_data[str(self.current_weekday)] = self.courses
-            
-            # 保存更新后的数据
-            with open('courses.json', 'w', encoding='utf-8') as file:
-                json.dump(courses_data, file, ensure_ascii=False, indent=4)
-            
-        except Exception as e:
-            print(f"保存课程数据时发生错误: {e}")
+        # 更新当前显示星期的课程数据
+        self.store.setCourses(self.current_weekday, self.courses)
+
+    def onScheduleChanged(self):
+        # courses.json 被外部修改后重新加载当前星期的课程，其他缓存页面在查看时更新
+        # 外部修改后，撤销记录中保存的课程列表已经过期
+        self.undo_stack.clear()
+        if not self._startup_done:
+            return
+        self.courses = self.loadCoursesFromFile(self.current_weekday)
+        self.refreshCourseWidgets()
+
+    @property
+    def current_page(self):
+        return self.pages[self.current_weekday]
+
+    @property
+    def course_widgets(self):
+        return self.current_page.course_widgets
+
+    def showPage(self, weekday):
+        # 切换到某天的页面：已缓存的页面直接翻页，过期时才对比更新
+        page = self.pages.get(weekday)
+        if page is None:
+            page = DayPage(weekday, self.show_delete_button, self.screen_, sort_by_time=self.sort_by_time)
+            self.pages[weekday] = page
+            self.page_stack.addWidget(page)
+        self.pages.move_to_end(weekday)
+        self.current_weekday = weekday
+        if page.revision != self.store.revision:
+            page.setCourses(self.loadCoursesFromFile(weekday), self.store.revision, self.store.dayIndex(weekday))
+        self.courses = page.courses
+        self.page_stack.setCurrentWidget(page)
+        self.evictPages()
 
+        if weekday == self.today_weekday:
+            self.updateCourseList()
+
+    def evictPages(self):
+        # 按最久未查看的顺序淘汰页面，当前页面始终保留
+        total_rows = sum(page.rowCount() for page in self.pages.values())
+        for weekday in list(self.pages):
+            if total_rows <= self.MAX_CACHED_ROWS:
+                break
+            if weekday == self.current_weekday:
+                continue
+            page = self.pages.pop(weekday)
+            total_rows -= page.rowCount()
+            self.page_stack.removeWidget(page)
+            page.deleteLater()
+
+    @instrumented('refreshCourseWidgets')
     def refreshCourseWidgets(self):
-        # 清除现有的组件
-        for i in reversed(range(self.layout().count())):
-            self.layout().itemAt(i).widget().setParent(None)
+        # 当前页面按标识增量更新为 self.courses
+        self.current_page.setCourses(self.courses, self.store.revision, self.store.dayIndex(self.current_weekday))
+
+        if self.isWeekView():
+            self.week_grid.setSchedule(self.store.index, self.store.revision)
+
+        # 课程变化后重新计算下一个上下课时间点并刷新高亮
+        self.scheduler.setDayIndex(self.store.dayIndex(self.today_weekday), self)
+        self.updateCourseList()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        # 窗口被移到其他屏幕时按新屏幕重新计算尺寸
+        handle = self.windowHandle()
+        if handle is not None and not getattr(self, '_screen_connected', False):
+            handle.screenChanged.connect(self.onScreenChanged)
+            self._screen_connected = True
+
+    def onScreenChanged(self, screen):
+        self.onMetricsChanged()
 
-        # 重新添加星期选择下拉框
-        self.layout().addWidget(self.weekday_combo)
+    def onMetricsChanged(self):
+        # 屏幕配置或 DPI 变化后更新字体、窗口尺寸和位置
+        self.screen_ = self.metrics.screenFor(self)
+        for page in self.pages.values():
+            page.setScreen(self.screen_)
+        window_width, window_height = self.calculateWindowSize()
+        self.setFixedSize(window_width, window_height)
+        self.moveToRightTop()
 
-        # 获取当前课程总数
-        total_courses = len(self.courses)
+    def _modeStamp(self):
+        try:
+            stat = os.stat(self.mode_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _readMode(self, known_stamp):
+        # 在工作线程中运行：change.txt 未变化时返回 None，课表保存等其他文件的变化不影响模式
+        stamp = self._modeStamp()
+        if stamp == known_stamp:
+            return None
+        return stamp, self.check_delete_button_status()
 
-        # 添加课程组件
-        for course in self.courses:
-            course_widget = CourseWidget(course, self.show_delete_button, total_courses)
-            self.layout().addWidget(course_widget)
+    def _writeMode(self, show_delete_button):
+        # 在工作线程中运行：先写临时文件再替换，读取时不会看到写了一半的内容
+        temp_path = f"{self.mode_path}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                file.write('1' if show_delete_button else '0')
+            os.replace(temp_path, self.mode_path)
+        except OSError as e:
+            print(f"写入change.txt时发生错误: {e}")
+            return None
+        return self._modeStamp()
 
-        # 重新添加按钮
-        self.layout().addWidget(self.add_button)
+    def onModeFileChanged(self, path):
+        self.watcher.watch(self.mode_path, self.onModeFileChanged)
+        # 在后台读取 change.txt，连续的变化通知合并为一次读取；各窗口的读取按文件区分
+        self.io.submit(('mode', self.mode_path), self._readMode, self._mode_stamp, timeout_ms=self.IO_TIMEOUT_MS)
+
+    def onIoFinished(self, key, result):
+        if key == ('mode', self.mode_path) and result is not None:
+            self._mode_stamp, show_delete_button = result
+            if show_delete_button != self.show_delete_button:
+                self.setShowDeleteButton(show_delete_button)
+        elif key == ('mode-write', self.mode_path) and result is not None:
+            self._mode_stamp = result
+
+    def handleCommand(self, command):
+        # 第二次启动的进程转发来的命令
+        if command == 'show':
+            self.showNormal()
+            self.raise_()
+            self.activateWindow()
+        elif command == 'reload':
+            # 批量修改文件后由脚本通知，修改时间未变化时也重新读取
+            self.store.checkForChanges(force=True)
+            if self.sync is not None:
+                self.sync.fetchNow()
+        elif command in ('edit', 'display'):
+            show_delete_button = command == 'edit'
+            if show_delete_button != self.show_delete_button:
+                self.setShowDeleteButton(show_delete_button)
+            # 写入 change.txt，之后重新读取或重新启动时保持这个模式
+            self.io.submit(('mode-write', self.mode_path), self._writeMode, show_delete_button,
+                           timeout_ms=self.IO_TIMEOUT_MS)
+
+    def setShowDeleteButton(self, show_delete_button):
+        # 切换编辑/显示模式：只更新现有组件的可见性和窗口尺寸
+        self.show_delete_button = show_delete_button
+        self.add_button.setVisible(show_delete_button)
+        self.bulk_button.setVisible(show_delete_button)
+        self.sort_checkbox.setVisible(show_delete_button)
+        self.setUndoShortcuts(show_delete_button)
+        for page in self.pages.values():
+            page.setShowDeleteButton(show_delete_button)
+        self.onMetricsChanged()
 
     def onWeekdayChanged(self, index):
-        # 更新当前显示的星期
-        self.current_weekday = index + 1
-        # 加载选中星期的课程
-        self.courses = self.loadCoursesFromFile(self.current_weekday)
-        # 刷新显示
-        self.refreshCourseWidgets()
+        # 切换到选中星期的页面，课程来自内存中的整周数据
+        was_week_view = self.isWeekView()
+        if index == self.WEEK_VIEW_INDEX:
+            self.showWeekGrid()
+        else:
+            self.showPage(index + 1)
+        # 添加课程和批量编辑只对单日页面有效
+        self.add_button.setEnabled(not self.isWeekView())
+        self.bulk_button.setEnabled(not self.isWeekView())
+        if was_week_view != self.isWeekView():
+            self.onMetricsChanged()
+
+    def setSortByTime(self, sort_by_time):
+        # 只改变显示顺序，课程数据和 position 不变
+        self.sort_by_time = sort_by_time
+        for page in self.pages.values():
+            page.setSortByTime(sort_by_time)
+        self.updateCourseList()
+
+    def isWeekView(self):
+        return self.week_grid is not None and self.page_stack.currentWidget() is self.week_grid
+
+    def showWeekGrid(self):
+        # 整周总览直接使用存储层解析好的索引，绘制为一张缓存图片
+        if self.week_grid is None:
+            self.week_grid = WeekGridView()
+            self.page_stack.addWidget(self.week_grid)
+        self.week_grid.setSchedule(self.store.index, self.store.revision)
+        self.page_stack.setCurrentWidget(self.week_grid)
+        self.updateCourseList()
+
+    def onDayChanged(self, weekday):
+        # 跨过午夜后切换到新的一天，正在看当天课表时跟随切换
+        following_today = self.current_weekday == self.today_weekday and not self.isWeekView()
+        self.today_weekday = weekday
+        self.scheduler.setDayIndex(self.store.dayIndex(weekday), self)
+        if self.isWeekView():
+            self.updateCourseList()
+        elif following_today:
+            self.weekday_combo.setCurrentIndex(weekday - 1)
 
     def removeCourse(self, course):
-        if course in self.courses:
-            self.courses.remove(course)
-            self.saveCoursesToFile()
-            self.refreshCourseWidgets()
+        # 按 id 删除，不会误删同名同时间的另一门课程
+        if self.store.rowOf(self.current_weekday, course.id) is not None:
+            courses = removeCourses(self.store.courses(self.current_weekday), [course.id])
+            self.editDays('删除课程', {self.current_weekday: courses})
 
     def addCourse(self):
-        # 预定义课程列表
-        subjects = ['语文', '数学', '英语', '信息', '美术', '音乐', '体育', '物理', '化学', '生物', '地理', '历史', '政治']
-        
-        # 创建课程选择对话框
-        dialog = QDialog(self)
-        dialog.setWindowTitle('添加课程')
-        dialog_layout = QVBoxLayout()
-        
-        # 课程选择下拉框
-        subject_combo = QComboBox()
-        subject_combo.addItems(subjects)
-        dialog_layout.addWidget(QLabel('选择课程:'))
-        dialog_layout.addWidget(subject_combo)
-        
-        # 时间选择下拉框
-        time_combo = QComboBox()
-        times = ['08:00-09:00', '09:10-10:10', '10:30-11:30', '13:00-14:00', 
-                 '14:10-15:10', '15:30-16:30', '16:40-17:40']
-        time_combo.addItems(times)
-        dialog_layout.addWidget(QLabel('选择时间:'))
-        dialog_layout.addWidget(time_combo)
-        
-        # 课程位置选择下拉框
-        position_combo = QComboBox()
-        positions = [str(i) for i in range(1, len(self.courses) + 2)]
-        position_combo.addItems(positions)
-        dialog_layout.addWidget(QLabel('选择位置:'))
-        dialog_layout.addWidget(position_combo)
-        
-        # 确认和取消按钮
-        button_box = QDialogButtonBox(
-            QDialogButtonBox.Ok | QDialogButtonBox.Cancel
-        )
-        button_box.accepted.connect(dialog.accept)
-        button_box.rejected.connect(dialog.reject)
-        dialog_layout.addWidget(button_box)
-        
-        dialog.setLayout(dialog_layout)
-        
-        # 显示对话框并等待用户响应
-        if dialog.exec_() == QDialog.Accepted:
-            course_name = subject_combo.currentText()
-            course_time = time_combo.currentText()
-            course_position = int(position_combo.currentText())
-            
-            new_course = {
-                'name': course_name,
-                'time': course_time,
-                'position': course_position
-            }
-            
-            # 更新当前显示星期的课程
-            self.courses.insert(course_position - 1, new_course)
-            self.saveCoursesToFile()
-            self.refreshCourseWidgets()
+        # 添加和修改课程共用一个缓存的对话框
+        editor = self.editor(CourseEditor)
+        if not editor.edit('添加课程', len(self.courses) + 1):
+            return
+        course_name, course_time, course_position = editor.values()
+        if not self.confirmOverlap(course_time):
+            return
 
+        # 更新当前显示星期的课程
+        courses = list(self.courses)
+        courses.insert(course_position - 1, CourseRecord(course_name, course_time, course_position))
+        self.editDays('添加课程', {self.current_weekday: courses})
+
+    def confirmOverlap(self, course_time, exclude=None):
+        # 与当天其他课程时间重叠时提示，由用户决定是否仍然保存
+        try:
+            start, end = parseTimeRange(course_time)
+        except TimeFormatError:
+            return True
+        index = self.store.dayIndex(self.current_weekday)
+        overlapping = [index.course(i) for i in index.overlapping(start, end, exclude)]
+        if not overlapping:
+            return True
+        names = '、'.join(f"{c.name} {formatMinutes(c.start)}-{formatMinutes(c.end)}" for c in overlapping)
+        reply = QMessageBox.question(self, '时间重叠',
+                                     f"该课程与 {names} 时间重叠，仍要保存吗？",
+                                     QMessageBox.Yes | QMessageBox.No,
+                                     QMessageBox.No)
+        return reply == QMessageBox.Yes
+
+    @instrumented('updateCourseList')
     def updateCourseList(self):
-        current_time = QTime.currentTime()
+        current_time = self.scheduler.currentTime()
+        # 整周总览只需更新今天正在上的课程
+        if self.isWeekView():
+            minute = current_time.hour() * 60 + current_time.minute()
+            self.week_grid.setCurrent(self.today_weekday, self.store.dayIndex(self.today_weekday).currentIndices(minute))
+            return
+
         # 只在显示当天课表时更新高亮
-        if self.current_weekday == self.today_weekday:
-            file_courses = self.loadCoursesFromFile(self.today_weekday)
+        if self.current_weekday == self.today_weekday and self.current_weekday in self.pages:
+            # 时间已在加载时解析，这里只需二分查找正在上的课程
+            minute = current_time.hour() * 60 + current_time.minute()
+            current = self.store.dayIndex(self.today_weekday).currentIndices(minute)
 
-            for i, course in enumerate(self.courses):
-                course_time_range = course['time'].split('-')
-                if len(course_time_range) != 2:
-                    continue
-                    
-                start_time = QTime.fromString(course_time_range[0], 'hh:mm')
-                end_time = QTime.fromString(course_time_range[1], 'hh:mm')
-                course_widget = self.layout().itemAt(i + 1).widget()  # +1 是因为有下拉框
-
-                if course_widget is None or not isinstance(course_widget, CourseWidget):
-                    course_widget = CourseWidget(course, self.show_delete_button)
-                    self.layout().insertWidget(i + 1, course_widget)
-
-                # 检查当前时间是否在课程时间范围内
-                if start_time <= current_time < end_time:
-                    course_widget.name_label.setStyleSheet('background-color: yellow;')
-                else:
-                    course_widget.name_label.setStyleSheet('')
-
-                if course not in file_courses:
-                    self.courses.remove(course)
-                    self.saveCoursesToFile()
-                    self.layout().removeWidget(course_widget)
-                    course_widget.setParent(None)
-                    print(f"课程 {course} 已被移除。")
+            # 页面内容与 self.courses 不一致时先对比更新页面，组件统一由页面创建
+            if self.current_page.courses is not self.courses:
+                self.current_page.setCourses(self.courses, self.store.revision, self.store.dayIndex(self.current_weekday))
+
+            # 页面按显示顺序更新高亮，大课表只更新模型中变化的行
+            self.current_page.setCurrentIndices(current)
 
     def moveToRightTop(self):
-        # 获取屏幕尺寸
-        screen = QDesktopWidget().screenGeometry()
+        # 同一进程的多个窗口由 ScheduleHost 从右向左依次排列
+        if self.host is not None:
+            self.host.arrangeWindows()
+        else:
+            self.placeWindow(10)  # 距离右边缘10像素
+
+    def placeWindow(self, right_margin):
+        # 获取窗口所在屏幕的尺寸
+        screen = self.metrics.screenGeometry(self.screen_)
         # 获取窗口尺寸
         size = self.geometry()
-        # 计算右上角位置（留出一些边距）
-        x = screen.width() - size.width() - 10  # 距离右边缘10像素
-        y = 10  # 距离上边缘10像素
+        # 计算右上角位置（留出一些边距），多屏时加上屏幕自身的偏移
+        x = screen.x() + screen.width() - size.width() - right_margin
+        y = screen.y() + 10  # 距离上边缘10像素
         # 移动窗口
         self.move(x, y)
 
     def editCourse(self, course):
-        # 预定义课程列表
-        subjects = ['语文', '数学', '英语', '信息', '美术', '音乐', '体育', '物理', '化学', '生物', '地理', '历史', '政治']
-        
-        # 创建课程编辑对话框
-        dialog = QDialog(self)
-        dialog.setWindowTitle('修改课程')
-        dialog_layout = QVBoxLayout()
-        
-        # 课程选择下拉框
-        subject_combo = QComboBox()
-        subject_combo.addItems(subjects)
-        subject_combo.setCurrentText(course['name'])  # 设置当前课程名称
-        dialog_layout.addWidget(QLabel('选择课程:'))
-        dialog_layout.addWidget(subject_combo)
-        
-        # 时间选择下拉框
-        time_combo = QComboBox()
-        times = ['08:00-09:00', '09:10-10:10', '10:30-11:30', '13:00-14:00', 
-                 '14:10-15:10', '15:30-16:30', '16:40-17:40']
-        time_combo.addItems(times)
-        time_combo.setCurrentText(course['time'])  # 设置当前时间
-        dialog_layout.addWidget(QLabel('选择时间:'))
-        dialog_layout.addWidget(time_combo)
-        
-        # 课程位置选择下拉框
-        position_combo = QComboBox()
-        positions = [str(i) for i in range(1, len(self.courses) + 1)]
-        position_combo.addItems(positions)
-        current_position = self.courses.index(course) + 1
-        position_combo.setCurrentText(str(current_position))  # 设置当前位置
-        dialog_layout.addWidget(QLabel('选择位置:'))
-        dialog_layout.addWidget(position_combo)
-        
-        # 确认和取消按钮
-        button_box = QDialogButtonBox(
-            QDialogButtonBox.Ok | QDialogButtonBox.Cancel
-        )
-        button_box.accepted.connect(dialog.accept)
-        button_box.rejected.connect(dialog.reject)
-        dialog_layout.addWidget(button_box)
-        
-        dialog.setLayout(dialog_layout)
-        
-        # 显示对话框并等待用户响应
-        if dialog.exec_() == QDialog.Accepted:
-            # 从课程列表中移除原课程
-            self.courses.remove(course)
-            
-            # 创建新的课程数据
-            updated_course = {
-                'name': subject_combo.currentText(),
-                'time': time_combo.currentText(),
-                'position': int(position_combo.currentText())
-            }
-            
-            # 在新位置插入更新后的课程
-            self.courses.insert(int(position_combo.currentText()) - 1, updated_course)
-            
-            # 保存并刷新显示
-            self.saveCoursesToFile()
-            self.refreshCourseWidgets()
+        row = self.store.rowOf(self.current_weekday, course.id)
+        if row is None:
+            return
+        editor = self.editor(CourseEditor)
+        if not editor.edit('修改课程', len(self.courses), course, row + 1):
+            return
+        course_name, course_time, position = editor.values()
+
+        # 对话框打开期间课表可能被重新加载，按 id 重新定位
+        courses = self.store.courses(self.current_weekday)
+        row = self.store.rowOf(self.current_weekday, course.id)
+        if row is None or not self.confirmOverlap(course_time, exclude=row):
+            return
+
+        # 创建同一 id 的新课程记录并移到新位置
+        del courses[row]
+        courses.insert(position - 1, course.replace(name=course_name, time=course_time, position=position))
+        self.editDays('修改课程', {self.current_weekday: courses})
+
+    def editor(self, cls):
+        # 编辑对话框只创建一次，之后重复使用
+        dialog = self._editors.get(cls)
+        if dialog is None:
+            dialog = self._editors[cls] = cls(self)
+        return dialog
+
+    def editDays(self, text, days):
+        # 每次修改作为一个撤销步骤，涉及的所有星期只保存一次、刷新一次
+        self.undo_stack.push(ScheduleEdit(self, text, days))
+
+    def applyDays(self, days):
+        self.store.setDays(days)
+        self.courses = self.loadCoursesFromFile(self.current_weekday)
+        self.refreshCourseWidgets()
+
+    def organizeDay(self):
+        # 拖动排序和多选删除在对话框中完成，确定后一次应用
+        ids = self.editor(DayOrganizer).organize(f"整理{WEEKDAY_NAMES[self.current_weekday - 1]}的课程", self.courses)
+        if ids is None:
+            return
+        courses = reorderDay(self.store.courses(self.current_weekday), ids)
+        if courses != self.store.courses(self.current_weekday):
+            self.editDays('整理课程', {self.current_weekday: courses})
+
+    def copyDayTo(self):
+        weekdays = self.editor(CopyDayDialog).chooseDays(self.current_weekday)
+        if weekdays:
+            courses = self.store.courses(self.current_weekday)
+            self.editDays('复制课程', {weekday: copyDay(courses) for weekday in weekdays})
+
+    def swapDays(self):
+        weekday = self.editor(SwapDayDialog).chooseDay(self.current_weekday)
+        if weekday is not None:
+            self.editDays('交换星期', {self.current_weekday: self.store.courses(weekday),
+                                     weekday: self.store.courses(self.current_weekday)})
+
+    def replaceSubject(self):
+        days = {weekday: self.store.courses(weekday) for weekday in range(1, 8)}
+        names = sorted({course.name for courses in days.values() for course in courses})
+        replacement = self.editor(ReplaceDialog).chooseReplacement(names)
+        if replacement is not None:
+            changed = replaceName(days, *replacement)
+            if changed:
+                self.editDays('替换课程', changed)
 
     def setup_autostart(self):
         try:
@@ -383,19 +657,22 @@ cd /d "{app_dir}"
             # 保存bat文件
             bat_path = os.path.join(app_dir, 'course_startup.bat')
             try:
-                with open(bat_path, 'w', encoding='utf-8') as f:
-                    f.write(bat_content)
-                print(f"启动脚本已创建: {bat_path}")
+                # 内容已经正确时跳过写入
+                if self._readText(bat_path) != bat_content:
+                    with open(bat_path, 'w', encoding='utf-8') as f:
+                        f.write(bat_content)
+                    print(f"启动脚本已创建: {bat_path}")
                 
                 # 获取启动文件夹路径
                 startup_folder = os.path.join(os.getenv('APPDATA'), 
                                             r'Microsoft\Windows\Start Menu\Programs\Startup')
                 
-                # 复制bat文件到启动文件夹
+                # 复制bat文件到启动文件夹，已是最新时跳过
                 startup_bat = os.path.join(startup_folder, 'Course.bat')
-                import shutil
-                shutil.copy2(bat_path, startup_bat)
-                print(f"已复制启动脚本到启动文件夹: {startup_bat}")
+                if self._readText(startup_bat) != bat_content:
+                    import shutil
+                    shutil.copy2(bat_path, startup_bat)
+                    print(f"已复制启动脚本到启动文件夹: {startup_bat}")
                 
             except Exception as e:
                 print(f"创建或复制启动脚本失败: {e}")
@@ -403,6 +680,13 @@ cd /d "{app_dir}"
         except Exception as e:
             print(f"设置开机自启动时发生错误: {e}")
 
+    def _readText(self, path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
     def check_and_fix_autostart(self):
         try:
             import winreg as reg
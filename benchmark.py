@@ -0,0 +1,601 @@
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import tempfile
+import subprocess
+
+# 无界面运行，便于在没有显示器的机器上测量
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+SUBJECTS = ['语文', '数学', '英语', '信息', '美术', '音乐', '体育', '物理', '化学', '生物', '地理', '历史', '政治']
+DEFAULT_SIZES = [5, 50, 500, 5000]
+PATHS = ['startup', 'refresh', 'tick', 'weekday_switch', 'save']
+
+
+def syntheticCourses(count, prefix=''):
+    courses = []
+    for i in range(count):
+        start = (i * 7) % (23 * 60)
+        courses.append({
+            'name': f"{prefix}{SUBJECTS[i % len(SUBJECTS)]}{i}",
+            'time': f"{start // 60:02d}:{start % 60:02d}-{(start + 5) // 60:02d}:{(start + 5) % 60:02d}",
+            'position': i + 1,
+        })
+    return courses
+
+
+def syntheticRecords(count, prefix=''):
+    from course_record import CourseRecord
+    return [CourseRecord.fromDict(course) for course in syntheticCourses(count, prefix)]
+
+
+def writeSchedule(directory, per_day):
+    data = {str(day): syntheticCourses(per_day) for day in range(1, 8)}
+    with open(os.path.join(directory, 'courses.json'), 'w', encoding='utf-8') as file:
+        json.dump(data, file, ensure_ascii=False)
+    with open(os.path.join(directory, 'change.txt'), 'w', encoding='utf-8') as file:
+        file.write('1')
+
+
+def timeIt(func, repeat=5, setup=None):
+    # setup 在每次计时之前运行，不计入耗时
+    best = None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def peakRssKb():
+    # Linux 下 ru_maxrss 的单位是 KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def qtObjectCounts(app, window):
+    from PyQt5.QtCore import QObject
+    return {
+        'widgets': len(app.allWidgets()),
+        'window_children': len(window.findChildren(QObject)),
+    }
+
+
+def idleTickCost(app, window, ticks=5):
+    # 高亮没有变化的时钟刷新不应重新应用样式，也不应引起重绘
+    from PyQt5.QtCore import QObject, QEvent
+
+    class EventCounter(QObject):
+        def __init__(self, page):
+            super().__init__()
+            self.page = page
+            self.counts = {'restyles': 0, 'repaints': 0}
+
+        def eventFilter(self, obj, event):
+            if obj.isWidgetType() and (obj is self.page or self.page.isAncestorOf(obj)):
+                if event.type() == QEvent.DynamicPropertyChange:
+                    self.counts['restyles'] += 1
+                elif event.type() == QEvent.Paint:
+                    self.counts['repaints'] += 1
+            return False
+
+    # 先处理完之前操作留下的布局和重绘事件
+    window.updateCourseList()
+    for _ in range(5):
+        app.processEvents()
+        time.sleep(0.02)
+    counter = EventCounter(window.current_page)
+    app.installEventFilter(counter)
+    try:
+        for _ in range(ticks):
+            window.updateCourseList()
+            app.processEvents()
+    finally:
+        app.removeEventFilter(counter)
+    return counter.counts
+
+
+def displayRenderCost(app, window, ticks=5, repaints=20):
+    # 显示模式下空闲的时钟刷新和窗口重绘只复制缓存的图片，不应重新绘制课程列表
+    # 大课表在显示模式下仍使用列表视图，返回 None
+    from PyQt5.QtCore import QEvent
+    window.setShowDeleteButton(False)
+    for _ in range(5):
+        app.processEvents()
+    display = window.current_page.display
+    result = None
+    if display is not None:
+        renders = display.renders
+        for _ in range(ticks):
+            window.updateCourseList()
+            app.processEvents()
+        start = time.perf_counter()
+        for _ in range(repaints):
+            display.repaint()
+        result = {'renders': display.renders - renders,
+                  'paint_ms': (time.perf_counter() - start) * 1000 / repaints}
+    window.setShowDeleteButton(True)
+    app.processEvents()
+    # 切换模式时被替换的组件要在事件循环外立即删除，不计入组件数量
+    app.sendPostedEvents(None, QEvent.DeferredDelete)
+    return result
+
+
+def benchSize(per_day, repeat):
+    # 在独立进程中运行，使峰值内存只反映这一种课表规模
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv)
+    directory = tempfile.TemporaryDirectory(prefix='course-bench-')
+    writeSchedule(directory.name, per_day)
+    os.chdir(directory.name)
+
+    from app import CourseScheduleApp
+    results = {'per_day': per_day, 'ms': {}}
+
+    start = time.perf_counter()
+    window = CourseScheduleApp()
+    window.show()
+    app.processEvents()
+    window.finishStartup()
+    results['ms']['startup'] = (time.perf_counter() - start) * 1000
+
+    base = list(window.courses)
+    toggle = [False]
+
+    def refresh():
+        # 每次刷新交替修改一门课程
+        toggle[0] = not toggle[0]
+        replaced = syntheticRecords(1, 'new') if toggle[0] else base[-1:]
+        window.courses = base[:-1] + replaced
+        window.refreshCourseWidgets()
+
+    results['ms']['refresh'] = timeIt(refresh, repeat) * 1000
+    results['ms']['tick'] = timeIt(window.updateCourseList, repeat) * 1000
+    results['idle_tick'] = idleTickCost(app, window)
+    results['display'] = displayRenderCost(app, window)
+
+    today_index = window.today_weekday - 1
+    days = [(today_index + 1) % 7, today_index]
+    step = [1]
+
+    def switch():
+        step[0] += 1
+        window.weekday_combo.setCurrentIndex(days[step[0] % 2])
+
+    results['ms']['weekday_switch'] = timeIt(switch, repeat) * 1000
+
+    def save():
+        window.saveCoursesToFile()
+        window.store.flush()
+
+    results['ms']['save'] = timeIt(save, repeat) * 1000
+
+    app.processEvents()
+    results['peak_rss_kb'] = peakRssKb()
+    results['qt_objects'] = qtObjectCounts(app, window)
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    directory.cleanup()
+    return results
+
+
+def benchRefreshScaling(totals=(20, 50, 500), changes=(0, 1, 10), repeat=5):
+    # 刷新耗时应随改动数量增长，而不是随课程总数增长
+    # 20 门课程使用课程组件，50 和 500 门课程使用列表视图
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv)
+    from app import CourseScheduleApp
+    results = []
+    cwd = os.getcwd()
+    for total in totals:
+        with tempfile.TemporaryDirectory() as directory:
+            writeSchedule(directory, total)
+            os.chdir(directory)
+            try:
+                window = CourseScheduleApp()
+                window.finishStartup()
+                base = list(window.courses)
+                for changed in changes:
+                    toggle = [False]
+
+                    def edit():
+                        # 交替替换末尾 changed 门课程，像编辑一样先写入存储层，每次刷新都有 changed 个增删
+                        toggle[0] = not toggle[0]
+                        replaced = syntheticRecords(changed, 'new') if toggle[0] else base[total - changed:]
+                        window.store.setCourses(window.current_weekday, base[:total - changed] + replaced)
+                        window.courses = window.loadCoursesFromFile(window.current_weekday)
+
+                    ms = timeIt(window.refreshCourseWidgets, repeat, setup=edit) * 1000
+                    results.append({'total': total, 'changed': changed, 'ms': ms})
+                window.store.flush()
+                window.close()
+                window.deleteLater()
+                app.processEvents()
+            finally:
+                os.chdir(cwd)
+    return results
+
+
+def benchHost(windows, per_day):
+    # 在独立进程中运行：一个进程通过 ScheduleHost 打开 windows 个课表窗口
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv)
+    directories = [tempfile.TemporaryDirectory(prefix='course-host-') for _ in range(windows)]
+    for directory in directories:
+        writeSchedule(directory.name, per_day)
+
+    from schedule_host import ScheduleHost
+    start = time.perf_counter()
+    host = ScheduleHost([directory.name for directory in directories])
+    host.show()
+    app.processEvents()
+    for window in host.windows:
+        window.finishStartup()
+    startup = (time.perf_counter() - start) * 1000
+    app.processEvents()
+
+    results = {'windows': windows, 'startup_ms': startup, 'peak_rss_kb': peakRssKb()}
+    for window in host.windows:
+        window.store.flush()
+    for directory in directories:
+        directory.cleanup()
+    return results
+
+
+def runHosting(windows, per_day):
+    # 比较 windows 个单窗口进程与一个进程打开 windows 个窗口的内存和启动耗时
+    def worker(count):
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--host-worker', str(count), '--sizes', str(per_day)],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True,
+        ).stdout
+        return json.loads(output.strip().splitlines()[-1])
+
+    single = [worker(1) for _ in range(windows)]
+    hosted = worker(windows)
+    return {
+        'windows': windows,
+        'per_day': per_day,
+        'processes_rss_kb': sum(result['peak_rss_kb'] for result in single),
+        'processes_startup_ms': sum(result['startup_ms'] for result in single),
+        'host_rss_kb': hosted['peak_rss_kb'],
+        'host_startup_ms': hosted['startup_ms'],
+        'process_rss_kb': single[0]['peak_rss_kb'],
+        # 每多一个窗口增加的内存
+        'extra_window_rss_kb': (hosted['peak_rss_kb'] - single[0]['peak_rss_kb']) / max(windows - 1, 1),
+    }
+
+
+def waitUntil(app, condition, timeout_ms=5000):
+    deadline = time.monotonic() + timeout_ms / 1000
+    while not condition():
+        if time.monotonic() >= deadline:
+            return False
+        app.processEvents()
+        time.sleep(0.005)
+    return True
+
+
+def startScheduleServer(data):
+    # 本地的课表服务器：HTTP/1.1 长连接，按 ETag 返回 304
+    import hashlib
+    import threading
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+    body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+    etag = f'"{hashlib.md5(body).hexdigest()}"'
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def setup(self):
+            super().setup()
+            self.server.stats['connections'] += 1
+            self.server.sockets.append(self.connection)
+
+        def do_GET(self):
+            if self.headers.get('If-None-Match') == etag:
+                self.server.stats['not_modified'] += 1
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            self.server.stats['ok'] += 1
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    server.stats = {'connections': 0, 'ok': 0, 'not_modified': 0}
+    server.sockets = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def stopScheduleServer(server):
+    # 停止接受新连接，并断开已经建立的长连接
+    import socket
+    server.shutdown()
+    server.server_close()
+    for connection in server.sockets:
+        try:
+            connection.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+def benchSync(per_day=20, requests=3, failures=3):
+    # 用本地服务器检查同步：课表未变化时只收到 304 且不解析，多次请求复用一个 TCP 连接，
+    # 服务器停止后按指数退避重试，并继续使用本地缓存的课表
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv)
+    from schedule_store import ScheduleStore
+    from schedule_sync import ScheduleSync
+
+    data = {str(day): syntheticCourses(per_day, f"同步{day}") for day in range(1, 8)}
+    server = startScheduleServer(data)
+    url = f"http://127.0.0.1:{server.server_address[1]}/courses.json"
+    directory = tempfile.TemporaryDirectory(prefix='course-sync-')
+    path = os.path.join(directory.name, 'courses.json')
+    results = {}
+    try:
+        store = ScheduleStore(path, debounce_ms=50, save_delay_ms=50)
+        sync = ScheduleSync(url, store, interval_ms=60 * 1000, retry_ms=50, max_backoff_ms=1000, timeout=2)
+        synced = []
+        sync.synced.connect(synced.append)
+
+        # 首次同步下载整周课表并写入本地缓存
+        sync.start()
+        waitUntil(app, lambda: synced and sync.etag is not None and store.waitForIdle(0))
+        first_revision = store.revision
+
+        # 课表未变化：每次请求都是 304，不解析、不替换内存中的课表
+        for _ in range(requests):
+            count = len(synced)
+            sync.fetchNow()
+            waitUntil(app, lambda: len(synced) > count)
+        results['requests'] = 1 + requests
+        results['not_modified'] = server.stats['not_modified']
+        results['parses'] = sync.source.parses
+        results['connections'] = server.stats['connections']
+        results['unchanged_revision'] = store.revision == first_revision
+
+        # 服务器停止后按指数退避重试，本地缓存的课表保持不变
+        stopScheduleServer(server)
+        delays = []
+        sync.fetchNow()
+        for attempt in range(1, failures + 1):
+            waitUntil(app, lambda: sync.failures >= attempt)
+            delays.append(sync.nextDelay())
+        sync.stop()
+        results['backoff_ms'] = delays
+        expected = [course['name'] for course in data['1']]
+        results['cached_in_memory'] = [course.name for course in store.courses(1)] == expected
+        # 重新启动时没有网络，从本地缓存文件读取
+        restarted = ScheduleStore(path)
+        results['cached_on_disk'] = [course.name for course in restarted.courses(1)] == expected
+    finally:
+        directory.cleanup()
+    return results
+
+
+def checkSync(results):
+    # 返回不符合预期的项目
+    problems = []
+    if results['not_modified'] != results['requests'] - 1:
+        problems.append(f"课表未变化时应返回 304: {results['not_modified']}/{results['requests'] - 1}")
+    if results['parses'] != 1 or not results['unchanged_revision']:
+        problems.append(f"304 时不应解析或替换课表: 解析 {results['parses']} 次")
+    if results['connections'] != 1:
+        problems.append(f"多次请求应复用一个连接: 建立了 {results['connections']} 个连接")
+    delays = results['backoff_ms']
+    if any(later <= earlier for earlier, later in zip(delays, delays[1:])):
+        problems.append(f"失败后的重试间隔应逐次增加: {delays}")
+    if not results['cached_in_memory'] or not results['cached_on_disk']:
+        problems.append("服务器停止后应继续使用本地缓存的课表")
+    return problems
+
+
+def runClock():
+    # 用手动时钟驱动高亮调度器，依次经过上课、下课、午夜和时间回拨，
+    # 返回 [(步骤, 期望, 实际)]，只由时钟推进触发刷新，不手动调用 updateCourseList
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtCore import QDate, QTime, QDateTime
+    app = QApplication.instance() or QApplication(sys.argv)
+    from app import CourseScheduleApp
+    from highlight_scheduler import ManualClock
+
+    # 2024-01-03 是星期三
+    wednesday = QDate(2024, 1, 3)
+    data = {
+        '3': [{'name': '语文', 'time': '08:00-09:00', 'position': 1},
+              {'name': '数学', 'time': '08:30-09:30', 'position': 2},
+              {'name': '英语', 'time': '10:00-11:00', 'position': 3}],
+        '4': [{'name': '物理', 'time': '08:00-09:00', 'position': 1}],
+    }
+    directory = tempfile.TemporaryDirectory(prefix='course-clock-')
+    with open(os.path.join(directory.name, 'courses.json'), 'w', encoding='utf-8') as file:
+        json.dump(data, file, ensure_ascii=False)
+    with open(os.path.join(directory.name, 'change.txt'), 'w', encoding='utf-8') as file:
+        file.write('1')
+
+    clock = ManualClock(QDateTime(wednesday, QTime(7, 55)))
+    window = CourseScheduleApp(clock=clock, data_dir=directory.name)
+    window.show()
+    app.processEvents()
+    window.finishStartup()
+
+    def state():
+        rows = [row for row, widget in enumerate(window.course_widgets) if widget.current]
+        return window.today_weekday, window.weekday_combo.currentIndex() + 1, rows
+
+    steps = [
+        ('开始前', None, (3, 3, [])),
+        ('第一节开始', QDateTime(wednesday, QTime(8, 0)), (3, 3, [0])),
+        ('下一节开始前一秒', QDateTime(wednesday, QTime(8, 29, 59)), (3, 3, [0])),
+        ('两节课重叠', QDateTime(wednesday, QTime(8, 30)), (3, 3, [0, 1])),
+        ('第一节结束', QDateTime(wednesday, QTime(9, 0)), (3, 3, [1])),
+        ('课间', QDateTime(wednesday, QTime(9, 30)), (3, 3, [])),
+        ('午夜前', QDateTime(wednesday, QTime(23, 59)), (3, 3, [])),
+        ('跨过午夜', QDateTime(wednesday.addDays(1), QTime(0, 0)), (4, 4, [])),
+        ('第二天上课', QDateTime(wednesday.addDays(1), QTime(8, 0)), (4, 4, [0])),
+        ('时间回拨', QDateTime(wednesday.addDays(1), QTime(7, 0)), (4, 4, [])),
+        ('回拨到前一天上课', QDateTime(wednesday, QTime(10, 30)), (3, 3, [2])),
+    ]
+    results = []
+    try:
+        for name, moment, expected in steps:
+            if moment is not None:
+                clock.setNow(moment)
+                app.processEvents()
+            results.append((name, expected, state()))
+    finally:
+        window.store.flush()
+        window.close()
+        directory.cleanup()
+    return results
+
+
+def runSuite(sizes, repeat):
+    # 每种规模启动一个子进程，互不影响内存统计
+    suite = []
+    for per_day in sizes:
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--worker', str(per_day), '--repeat', str(repeat)],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True,
+        ).stdout
+        suite.append(json.loads(output.strip().splitlines()[-1]))
+    return suite
+
+
+def compare(current, baseline, threshold, min_delta_ms=0.1):
+    # 返回所有比基准慢 threshold 以上的路径，忽略小于 min_delta_ms 的测量抖动
+    regressions = []
+    previous = {entry['per_day']: entry for entry in baseline}
+    for entry in current:
+        old = previous.get(entry['per_day'])
+        if old is None:
+            continue
+        for path, value in entry['ms'].items():
+            old_value = old['ms'].get(path)
+            if old_value is None or value - old_value < min_delta_ms:
+                continue
+            if value > old_value * (1 + threshold):
+                regressions.append((entry['per_day'], path, old_value, value))
+    return regressions
+
+
+def printSuite(suite):
+    print(f"{'per_day':>8} " + ' '.join(f"{path:>15}" for path in PATHS)
+          + f" {'peak_rss_kb':>12} {'widgets':>8} {'idle_restyles':>14} {'idle_repaints':>14}"
+          + f" {'display_renders':>16} {'display_paint':>14}")
+    for entry in suite:
+        display = entry.get('display')
+        print(f"{entry['per_day']:>8} " + ' '.join(f"{entry['ms'][path]:>12.2f} ms" for path in PATHS)
+              + f" {entry['peak_rss_kb']:>12} {entry['qt_objects']['widgets']:>8}"
+              + f" {entry['idle_tick']['restyles']:>14} {entry['idle_tick']['repaints']:>14}"
+              + (f" {display['renders']:>16} {display['paint_ms']:>11.3f} ms" if display else f" {'-':>16} {'-':>14}"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='桌面课表性能测试')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='每天的课程数量')
+    parser.add_argument('--repeat', type=int, default=5, help='每条路径重复次数，取最快一次')
+    parser.add_argument('--output', help='把结果写入 JSON 文件')
+    parser.add_argument('--compare', help='与之前保存的 JSON 结果比较')
+    parser.add_argument('--threshold', type=float, default=0.2, help='允许的变慢比例，超过时返回失败')
+    parser.add_argument('--min-delta-ms', type=float, default=0.1, help='小于该差值的变化视为测量抖动')
+    parser.add_argument('--refresh-scaling', action='store_true', help='只测量刷新耗时与改动数量的关系')
+    parser.add_argument('--clock', action='store_true', help='用手动时钟检查上下课、午夜和时间回拨时的高亮')
+    parser.add_argument('--sync', action='store_true', help='用本地服务器检查课表同步的 304、长连接和离线退避')
+    parser.add_argument('--hosting', type=int, metavar='N',
+                        help='比较 N 个单窗口进程与一个进程打开 N 个窗口，每天课程数取 --sizes 的第一个值')
+    parser.add_argument('--worker', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--host-worker', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker is not None:
+        print(json.dumps(benchSize(args.worker, args.repeat)))
+        return 0
+
+    if args.host_worker is not None:
+        print(json.dumps(benchHost(args.host_worker, args.sizes[0])))
+        return 0
+
+    if args.hosting:
+        result = runHosting(args.hosting, args.sizes[0])
+        print(f"{result['windows']} 个进程: {result['processes_rss_kb']} KB, 启动 {result['processes_startup_ms']:.1f} ms")
+        print(f"1 个进程 {result['windows']} 个窗口: {result['host_rss_kb']} KB, 启动 {result['host_startup_ms']:.1f} ms")
+        print(f"单个进程: {result['process_rss_kb']} KB, 每多一个窗口: {result['extra_window_rss_kb']:.0f} KB")
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as file:
+                json.dump(result, file, ensure_ascii=False, indent=4)
+        return 0
+
+    if args.refresh_scaling:
+        for result in benchRefreshScaling(repeat=args.repeat):
+            print(f"refreshCourseWidgets total={result['total']:5d} changed={result['changed']:3d}: {result['ms']:.2f} ms")
+        return 0
+
+    if args.clock:
+        status = 0
+        for name, expected, actual in runClock():
+            ok = expected == actual
+            status = status or (0 if ok else 1)
+            print(f"{'通过' if ok else '失败'} {name}: 今天=星期{actual[0]} 显示=星期{actual[1]} 高亮行={actual[2]}"
+                  + ('' if ok else f" 期望 今天=星期{expected[0]} 显示=星期{expected[1]} 高亮行={expected[2]}"))
+        return status
+
+    if args.sync:
+        results = benchSync()
+        print(f"请求 {results['requests']} 次: 304 {results['not_modified']} 次, 解析 {results['parses']} 次, "
+              f"TCP 连接 {results['connections']} 个")
+        print(f"服务器停止后的重试间隔: {results['backoff_ms']} ms, "
+              f"内存中的课表{'保留' if results['cached_in_memory'] else '丢失'}, "
+              f"重新启动后{'读取到' if results['cached_on_disk'] else '没有'}本地缓存")
+        problems = checkSync(results)
+        for problem in problems:
+            print(problem)
+        return 1 if problems else 0
+
+    suite = runSuite(args.sizes, args.repeat)
+    printSuite(suite)
+    status = 0
+    for entry in suite:
+        if any(entry['idle_tick'].values()):
+            print(f"空闲刷新产生了样式更新或重绘: per_day={entry['per_day']} {entry['idle_tick']}")
+            status = 1
+        if entry.get('display') and entry['display']['renders']:
+            print(f"显示模式的空闲刷新重新绘制了课程列表: per_day={entry['per_day']} {entry['display']}")
+            status = 1
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(suite, file, ensure_ascii=False, indent=4)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)
+        regressions = compare(suite, baseline, args.threshold, args.min_delta_ms)
+        for per_day, path, old_value, value in regressions:
+            print(f"性能回退: per_day={per_day} {path} {old_value:.2f} ms -> {value:.2f} ms")
+        if regressions:
+            return 1
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
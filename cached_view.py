@@ -0,0 +1,36 @@
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtGui import QPainter
+from PyQt5.QtCore import QEvent
+
+
+class CachedPixmapView(QWidget):
+    # 整体绘制在一张缓存图片上的视图：窗口重绘时只复制图片，
+    # 内容、尺寸、字体、调色板或 DPI 变化时才调用 renderPixmap 重新绘制
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pixmap = None
+
+    def renderPixmap(self, ratio):
+        # 由子类实现：按设备像素比绘制并返回整张图片
+        raise NotImplementedError
+
+    def invalidate(self):
+        self._pixmap = None
+        self.update()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.invalidate()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        # 字体或调色板变化后重新绘制
+        if event.type() in (QEvent.FontChange, QEvent.PaletteChange):
+            self.invalidate()
+
+    def paintEvent(self, event):
+        ratio = self.devicePixelRatioF()
+        if self._pixmap is None or self._pixmap.devicePixelRatioF() != ratio:
+            self._pixmap = self.renderPixmap(ratio)
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self._pixmap)
@@ -0,0 +1,190 @@
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QDialogButtonBox,
+                             QListWidget, QListWidgetItem, QAbstractItemView, QPushButton, QCheckBox)
+from PyQt5.QtCore import Qt
+
+# 预定义课程列表
+SUBJECTS = ['语文', '数学', '英语', '信息', '美术', '音乐', '体育', '物理', '化学', '生物', '地理', '历史', '政治']
+# 预定义上课时间
+TIMES = ['08:00-09:00', '09:10-10:10', '10:30-11:30', '13:00-14:00',
+         '14:10-15:10', '15:30-16:30', '16:40-17:40']
+WEEKDAY_NAMES = ['星期一', '星期二', '星期三', '星期四', '星期五', '星期六', '星期日']
+
+
+def _buttonBox(dialog):
+    # 确认和取消按钮
+    button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+    button_box.accepted.connect(dialog.accept)
+    button_box.rejected.connect(dialog.reject)
+    return button_box
+
+
+def _fill(combo, items, current=None):
+    # 导入或替换得到的名称和时间可能不在预定义列表中，加入列表后选中，原样保留
+    items = list(items)
+    if current is not None and current not in items:
+        items.append(current)
+    combo.clear()
+    combo.addItems(items)
+    combo.setCurrentIndex(items.index(current) if current is not None else 0)
+
+
+class CourseEditor(QDialog):
+    # 添加和修改课程共用的对话框，创建一次后重复使用
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        dialog_layout = QVBoxLayout()
+
+        # 课程选择下拉框
+        self.subject_combo = QComboBox()
+        self.subject_combo.addItems(SUBJECTS)
+        dialog_layout.addWidget(QLabel('选择课程:'))
+        dialog_layout.addWidget(self.subject_combo)
+
+        # 时间选择下拉框
+        self.time_combo = QComboBox()
+        self.time_combo.addItems(TIMES)
+        dialog_layout.addWidget(QLabel('选择时间:'))
+        dialog_layout.addWidget(self.time_combo)
+
+        # 课程位置选择下拉框
+        self.position_combo = QComboBox()
+        dialog_layout.addWidget(QLabel('选择位置:'))
+        dialog_layout.addWidget(self.position_combo)
+
+        dialog_layout.addWidget(_buttonBox(self))
+        self.setLayout(dialog_layout)
+
+    def edit(self, title, positions, course=None, position=1):
+        # 显示对话框并等待用户响应；course 为空时添加课程
+        # 每次重新填充所有选项，不沿用上一次编辑的选择
+        self.setWindowTitle(title)
+        _fill(self.subject_combo, SUBJECTS, course.name if course is not None else None)
+        _fill(self.time_combo, TIMES, course.time if course is not None else None)
+        _fill(self.position_combo, [str(i) for i in range(1, positions + 1)], str(position))
+        return self.exec_() == QDialog.Accepted
+
+    def values(self):
+        return self.subject_combo.currentText(), self.time_combo.currentText(), int(self.position_combo.currentText())
+
+
+class DayOrganizer(QDialog):
+    # 整理一天的课程：拖动调整顺序，多选后删除，确定后作为一次修改应用
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        dialog_layout = QVBoxLayout()
+        dialog_layout.addWidget(QLabel('拖动调整顺序，按住 Ctrl 或 Shift 多选:'))
+
+        self.course_list = QListWidget()
+        self.course_list.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.course_list.setDragDropMode(QAbstractItemView.InternalMove)
+        self.course_list.setDefaultDropAction(Qt.MoveAction)
+        dialog_layout.addWidget(self.course_list)
+
+        self.delete_button = QPushButton('删除所选')
+        self.delete_button.clicked.connect(self.deleteSelected)
+        dialog_layout.addWidget(self.delete_button)
+
+        dialog_layout.addWidget(_buttonBox(self))
+        self.setLayout(dialog_layout)
+
+    def deleteSelected(self):
+        for item in self.course_list.selectedItems():
+            self.course_list.takeItem(self.course_list.row(item))
+
+    def organize(self, title, courses):
+        # 返回整理后的课程 id 顺序，取消时返回 None
+        self.setWindowTitle(title)
+        self.course_list.clear()
+        for course in courses:
+            item = QListWidgetItem(f"{course.name}  {course.time}")
+            item.setData(Qt.UserRole, course.id)
+            self.course_list.addItem(item)
+        if self.exec_() != QDialog.Accepted:
+            return None
+        return [self.course_list.item(row).data(Qt.UserRole) for row in range(self.course_list.count())]
+
+
+class CopyDayDialog(QDialog):
+    # 选择要复制到的星期
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle('复制到其他星期')
+        dialog_layout = QVBoxLayout()
+        self.label = QLabel()
+        dialog_layout.addWidget(self.label)
+        self.checkboxes = []
+        for name in WEEKDAY_NAMES:
+            checkbox = QCheckBox(name)
+            self.checkboxes.append(checkbox)
+            dialog_layout.addWidget(checkbox)
+        dialog_layout.addWidget(QLabel('所选星期原有的课程会被替换'))
+        dialog_layout.addWidget(_buttonBox(self))
+        self.setLayout(dialog_layout)
+
+    def chooseDays(self, source):
+        # 返回所选的星期，取消或没有选择时返回空列表
+        self.label.setText(f"把{WEEKDAY_NAMES[source - 1]}的课程复制到:")
+        for weekday, checkbox in enumerate(self.checkboxes, start=1):
+            checkbox.setChecked(False)
+            checkbox.setEnabled(weekday != source)
+        if self.exec_() != QDialog.Accepted:
+            return []
+        return [weekday for weekday, checkbox in enumerate(self.checkboxes, start=1) if checkbox.isChecked()]
+
+
+class ReplaceDialog(QDialog):
+    # 在整周的课程中查找并替换课程名称
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle('查找替换课程')
+        dialog_layout = QVBoxLayout()
+
+        self.find_combo = QComboBox()
+        dialog_layout.addWidget(QLabel('查找课程:'))
+        dialog_layout.addWidget(self.find_combo)
+
+        self.replace_combo = QComboBox()
+        self.replace_combo.setEditable(True)
+        self.replace_combo.addItems(SUBJECTS)
+        dialog_layout.addWidget(QLabel('替换为:'))
+        dialog_layout.addWidget(self.replace_combo)
+
+        dialog_layout.addWidget(_buttonBox(self))
+        self.setLayout(dialog_layout)
+
+    def chooseReplacement(self, names):
+        # names 为整周出现过的课程名称，返回 (原名称, 新名称)，取消时返回 None
+        self.find_combo.clear()
+        self.find_combo.addItems(names)
+        if self.exec_() != QDialog.Accepted:
+            return None
+        old, new = self.find_combo.currentText(), self.replace_combo.currentText().strip()
+        if not old or not new or old == new:
+            return None
+        return old, new
+
+
+class SwapDayDialog(QDialog):
+    # 选择与当前星期交换课程的另一天
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle('交换星期')
+        dialog_layout = QVBoxLayout()
+        row = QHBoxLayout()
+        self.label = QLabel()
+        row.addWidget(self.label)
+        self.weekday_combo = QComboBox()
+        self.weekday_combo.addItems(WEEKDAY_NAMES)
+        row.addWidget(self.weekday_combo)
+        dialog_layout.addLayout(row)
+        dialog_layout.addWidget(_buttonBox(self))
+        self.setLayout(dialog_layout)
+
+    def chooseDay(self, source):
+        # 返回要交换的星期，取消或选择了同一天时返回 None
+        self.label.setText(f"{WEEKDAY_NAMES[source - 1]}与:")
+        self.weekday_combo.setCurrentIndex(source % 7)
+        if self.exec_() != QDialog.Accepted:
+            return None
+        weekday = self.weekday_combo.currentIndex() + 1
+        return None if weekday == source else weekday
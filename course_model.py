@@ -0,0 +1,241 @@
+from PyQt5.QtWidgets import QListView, QStyledItemDelegate, QStyle, QMessageBox, QAbstractItemView, QStyleOptionButton
+from PyQt5.QtGui import QColor, QFontMetrics, QPalette
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QRect, QSize, QEvent
+from layout_metrics import layoutMetrics
+from course_record import increasingRun
+
+# 自定义数据角色
+TimeRole = Qt.UserRole + 1
+CurrentRole = Qt.UserRole + 2
+CourseRole = Qt.UserRole + 3
+
+
+def _runs(rows):
+    # 把递增的行号分成连续的区间 [(first, last)]
+    runs = []
+    for row in rows:
+        if runs and runs[-1][1] == row - 1:
+            runs[-1] = (runs[-1][0], row)
+        else:
+            runs.append((row, row))
+    return runs
+
+
+class CourseListModel(QAbstractListModel):
+    # 课程列表模型，直接使用课表数据，不为每行创建组件
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.courses = []
+        self.current = frozenset()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.courses)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.courses):
+            return None
+        course = self.courses[index.row()]
+        if role == Qt.DisplayRole:
+            return course.name
+        if role == TimeRole:
+            return course.time
+        if role == CurrentRole:
+            return index.row() in self.current
+        if role == CourseRole:
+            return course
+        return None
+
+    def setCourses(self, courses):
+        # 按课程 id 对比新旧列表，只通知删除、移动、插入和内容变化的行，视图不需要整体重新布局
+        if courses == self.courses:
+            return
+        ids = [course.id for course in courses]
+        wanted = set(ids)
+        if len(wanted) != len(ids):
+            # id 重复时无法逐行对应
+            self.beginResetModel()
+            self.courses = list(courses)
+            self.current = frozenset()
+            self.endResetModel()
+            return
+        # 高亮按行号记录，行变化后由页面重新设置
+        self.setCurrentIndices(())
+
+        # 从后往前删除不再出现的课程，连续的行一次删除
+        removed = [row for row, course in enumerate(self.courses) if course.id not in wanted]
+        for first, last in reversed(_runs(removed)):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self.courses[first:last + 1]
+            self.endRemoveRows()
+
+        # 保留的课程中相对顺序不变的最长一组不动，其余课程移到目标顺序中前一门课程之后
+        kept = {course.id for course in self.courses}
+        target = [course_id for course_id in ids if course_id in kept]
+        if target == [course.id for course in self.courses]:
+            keep = range(len(target))
+        else:
+            rows = {course.id: row for row, course in enumerate(self.courses)}
+            keep = increasingRun([rows[course_id] for course_id in target])
+        for i, course_id in enumerate(target):
+            if i in keep:
+                continue
+            source = self._rowOf(course_id)
+            destination = 0 if i == 0 else self._rowOf(target[i - 1]) + 1
+            if destination == source or destination == source + 1:
+                continue
+            self.beginMoveRows(QModelIndex(), source, source, QModelIndex(), destination)
+            course = self.courses.pop(source)
+            self.courses.insert(destination - 1 if destination > source else destination, course)
+            self.endMoveRows()
+
+        # 插入新增的课程，连续的行一次插入
+        row = 0
+        while row < len(ids):
+            if ids[row] in kept:
+                row += 1
+                continue
+            end = row
+            while end < len(ids) and ids[end] not in kept:
+                end += 1
+            self.beginInsertRows(QModelIndex(), row, end - 1)
+            self.courses[row:row] = courses[row:end]
+            self.endInsertRows()
+            row = end
+
+        # 同一 id 的课程记录被替换时只刷新这些行
+        changed = [row for row, course in enumerate(courses) if self.courses[row] is not course]
+        for row in changed:
+            self.courses[row] = courses[row]
+        for first, last in _runs(changed):
+            self.dataChanged.emit(self.index(first), self.index(last))
+
+    def _rowOf(self, course_id):
+        return next(row for row, course in enumerate(self.courses) if course.id == course_id)
+
+    def setCurrentIndices(self, indices):
+        # 只通知高亮状态发生变化的行
+        indices = frozenset(indices)
+        changed = self.current ^ indices
+        self.current = indices
+        for row in changed:
+            if row < len(self.courses):
+                index = self.index(row)
+                self.dataChanged.emit(index, index, [CurrentRole])
+
+
+class CourseDelegate(QStyledItemDelegate):
+    # 直接绘制课程名称、时间和高亮；编辑模式下只在鼠标悬停的行绘制按钮
+    BUTTON_WIDTH = 48
+    BUTTON_SPACING = 6
+
+    def __init__(self, view):
+        super().__init__(view)
+        self.view = view
+
+    def fonts(self):
+        return layoutMetrics().fonts(self.view.model().rowCount(), self.view.screen_)
+
+    def sizeHint(self, option, index):
+        name_font, time_font = self.fonts()
+        height = max(QFontMetrics(name_font).height(), QFontMetrics(time_font).height()) + 10
+        return QSize(option.rect.width(), height)
+
+    def buttonRects(self, rect):
+        width, spacing = self.BUTTON_WIDTH, self.BUTTON_SPACING
+        delete_rect = QRect(rect.right() - spacing - width, rect.top() + 4, width, rect.height() - 8)
+        edit_rect = delete_rect.translated(-(width + spacing), 0)
+        return edit_rect, delete_rect
+
+    def paint(self, painter, option, index):
+        painter.save()
+        name_font, time_font = self.fonts()
+        rect = option.rect.adjusted(10, 0, -10, 0)
+        show_delete_button = self.view.show_delete_button
+        hovered = show_delete_button and option.state & QStyle.State_MouseOver
+
+        text_rect = QRect(rect)
+        if show_delete_button:
+            text_rect.setRight(rect.right() - 2 * (self.BUTTON_WIDTH + self.BUTTON_SPACING))
+        name_rect = QRect(text_rect)
+        if show_delete_button:
+            name_rect.setWidth(text_rect.width() // 2)
+
+        # 正在上的课程名称使用黄色背景
+        if index.data(CurrentRole):
+            painter.fillRect(name_rect, QColor('yellow'))
+
+        painter.setPen(option.palette.color(QPalette.WindowText))
+        painter.setFont(name_font)
+        painter.drawText(name_rect, Qt.AlignCenter, index.data(Qt.DisplayRole))
+
+        if show_delete_button:
+            painter.setFont(time_font)
+            time_rect = QRect(text_rect)
+            time_rect.setLeft(name_rect.right())
+            painter.drawText(time_rect, Qt.AlignCenter, index.data(TimeRole))
+
+        if hovered:
+            style = self.view.style()
+            for button_rect, text in zip(self.buttonRects(option.rect), ('修改', '删除')):
+                button = QStyleOptionButton()
+                button.rect = button_rect
+                button.text = text
+                button.state = QStyle.State_Enabled | QStyle.State_Raised
+                style.drawControl(QStyle.CE_PushButton, button, painter, self.view)
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        # 点击按钮区域时才打开编辑对话框或确认删除
+        if not self.view.show_delete_button or event.type() != QEvent.MouseButtonRelease:
+            return False
+        edit_rect, delete_rect = self.buttonRects(option.rect)
+        course = index.data(CourseRole)
+        if edit_rect.contains(event.pos()):
+            self.view.window().editCourse(course)
+            return True
+        if delete_rect.contains(event.pos()):
+            reply = QMessageBox.question(self.view, '确认删除',
+                                         f"确定要删除课程 '{course.name}' 吗？",
+                                         QMessageBox.Yes | QMessageBox.No,
+                                         QMessageBox.No)
+            if reply == QMessageBox.Yes:
+                self.view.window().removeCourse(course)
+            return True
+        return False
+
+
+class CourseListView(QListView):
+    # 大课表使用的列表视图：只绘制可见行，超出窗口高度时滚动
+    def __init__(self, show_delete_button, screen=None, parent=None):
+        super().__init__(parent)
+        self.show_delete_button = show_delete_button
+        self.screen_ = screen
+        self.setModel(CourseListModel(self))
+        self.setItemDelegate(CourseDelegate(self))
+        self.setUniformItemSizes(True)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setSelectionMode(QAbstractItemView.NoSelection)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setFrameShape(QListView.NoFrame)
+        self.setMouseTracking(True)
+        self.viewport().setAttribute(Qt.WA_Hover)
+        self.viewport().setAutoFillBackground(False)
+
+    def setCourses(self, courses):
+        count = self.model().rowCount()
+        self.model().setCourses(courses)
+        # 字体大小随课程数量变化，行高需要重新计算
+        if self.model().rowCount() != count:
+            self.scheduleDelayedItemsLayout()
+
+    def setCurrentIndices(self, indices):
+        self.model().setCurrentIndices(indices)
+
+    def setShowDeleteButton(self, show_delete_button):
+        self.show_delete_button = show_delete_button
+        self.viewport().update()
+
+    def setScreen(self, screen):
+        self.screen_ = screen
+        # 字体大小变化后行高需要重新计算
+        self.scheduleDelayedItemsLayout()
@@ -0,0 +1,133 @@
+import sys
+from schedule_index import parseTimeRange, formatMinutes, TimeFormatError
+
+# 已分配的最大课程 id，加载文件时会跳过文件中已有的 id
+_last_id = 0
+
+
+def _validId(course_id):
+    return isinstance(course_id, int) and not isinstance(course_id, bool) and course_id > 0
+
+
+def newId():
+    global _last_id
+    _last_id += 1
+    return _last_id
+
+
+def noteId(course_id):
+    global _last_id
+    _last_id = max(_last_id, course_id)
+
+
+class CourseRecord:
+    # 一门课程：名称驻留，时间保存为当天的分钟数，id 在保存和重新加载后保持不变
+    # 创建后视为不可变，修改课程时用 replace 生成同一 id 的新记录
+    __slots__ = ('id', 'name', 'start', 'end', 'position', '_time')
+
+    def __init__(self, name, time, position=None, id=None):
+        if id is None:
+            id = newId()
+        else:
+            noteId(id)
+        self.id = id
+        self.name = sys.intern(name)
+        self.position = position
+        try:
+            self.start, self.end = parseTimeRange(time)
+            self._time = None
+        except TimeFormatError:
+            # 格式错误的时间原样保留，由索引报告错误
+            self.start = self.end = None
+            self._time = time
+
+    @property
+    def time(self):
+        if self.start is None:
+            return self._time
+        return f"{formatMinutes(self.start)}-{formatMinutes(self.end)}"
+
+    def replace(self, name=None, time=None, position=None):
+        return CourseRecord(self.name if name is None else name,
+                            self.time if time is None else time,
+                            self.position if position is None else position,
+                            id=self.id)
+
+    def toDict(self):
+        course = {'name': self.name, 'time': self.time}
+        if self.position is not None:
+            course['position'] = self.position
+        course['id'] = self.id
+        return course
+
+    @classmethod
+    def fromDict(cls, course, id=None):
+        if id is None and _validId(course.get('id')):
+            id = course['id']
+        return cls(str(course.get('name', '')), course.get('time'), course.get('position'), id)
+
+    def __repr__(self):
+        return f"CourseRecord({self.id}, {self.name!r}, {self.time!r}, {self.position!r})"
+
+
+def recordsFromData(data):
+    # 把 courses.json 格式的数据转换为课程记录
+    # 返回 (数据, 需要重新保存的星期)：缺少 id 或 id 重复的课程会分配新的 id
+    records = {}
+    changed = set()
+    seen = set()
+    # 先记下文件中所有的 id，新分配的 id 不会与之后的课程冲突
+    for courses in data.values():
+        for course in courses if isinstance(courses, list) else ():
+            if isinstance(course, dict) and _validId(course.get('id')):
+                noteId(course['id'])
+    for weekday, courses in data.items():
+        if not isinstance(courses, list):
+            records[weekday] = courses
+            continue
+        day = []
+        for course in courses:
+            if not isinstance(course, dict):
+                continue
+            if not _validId(course.get('id')) or course['id'] in seen:
+                record = CourseRecord.fromDict(course, id=newId())
+                changed.add(weekday)
+            else:
+                record = CourseRecord.fromDict(course)
+            seen.add(record.id)
+            day.append(record)
+        records[weekday] = day
+    return records, changed
+
+
+def dataFromRecords(records):
+    return {weekday: [course.toDict() for course in courses] if isinstance(courses, list) else courses
+            for weekday, courses in records.items()}
+
+
+def increasingRun(values):
+    # 返回 values 中最长严格递增子序列的下标集合，None 不参与
+    # 按 id 对比新旧课程列表时，这些课程的相对顺序不变，无需移动
+    tails = []
+    previous = {}
+    for i, value in enumerate(values):
+        if value is None:
+            continue
+        low, high = 0, len(tails)
+        while low < high:
+            middle = (low + high) // 2
+            if values[tails[middle]] < value:
+                low = middle + 1
+            else:
+                high = middle
+        previous[i] = tails[low - 1] if low else None
+        if low == len(tails):
+            tails.append(i)
+        else:
+            tails[low] = i
+    keep = set()
+    i = tails[-1] if tails else None
+    while i is not None:
+        keep.add(i)
+        i = previous[i]
+    return keep
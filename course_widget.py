@@ -1,73 +1,44 @@
-from PyQt5.QtWidgets import QWidget, QHBoxLayout, QLabel, QPushButton, QMessageBox, QDesktopWidget
-from PyQt5.QtGui import QFont
+from PyQt5.QtWidgets import QWidget, QHBoxLayout, QLabel, QPushButton, QMessageBox
 from PyQt5.QtCore import Qt
+from layout_metrics import layoutMetrics
+from instrumentation import instrumented, trackWidget, count
+
+# 高亮样式只解析一次，由课程页设置；切换高亮时只修改动态属性
+HIGHLIGHT_STYLE = 'QLabel[current="true"] { background-color: yellow; }'
 
 class CourseWidget(QWidget):
-    def __init__(self, course, show_delete_button, total_courses):
+    def __init__(self, course, show_delete_button, total_courses, screen=None):
         super().__init__()
         self.course = course
         self.show_delete_button = show_delete_button  # 这个值现在来自 change.txt
         self.total_courses = total_courses
+        self.screen_ = screen  # 所在屏幕，为空时使用主屏幕
+        self.current = False  # 是否正在上这门课
+        trackWidget(self)
         self.initUI()
 
     def calculateFontSize(self):
-        # 获取屏幕尺寸
-        screen = QDesktopWidget().screenGeometry()
-        screen_height = screen.height()
-        screen_width = screen.width()
-
-        # 计算基础字体大小
-        # 考虑屏幕高度、宽度和课程数量
-        base_size = min(screen_height / (self.total_courses * 3), screen_width / 50)
-        
-        # 根据不同的屏幕分辨率范围调整字体大小
-        if screen_height <= 768:  # 小屏幕
-            name_size = max(12, min(base_size * 0.8, 18))
-            time_size = max(8, min(base_size * 0.4, 12))
-        elif screen_height <= 1080:  # 中等屏幕
-            name_size = max(16, min(base_size * 0.9, 24))
-            time_size = max(10, min(base_size * 0.5, 14))
-        else:  # 大屏幕
-            name_size = max(20, min(base_size, 32))
-            time_size = max(12, min(base_size * 0.6, 16))
-
-        # 根据课程数量进行微调
-        if self.total_courses > 7:
-            name_size *= 0.85
-            time_size *= 0.85
-        elif self.total_courses < 4:
-            name_size *= 1.2
-            time_size *= 1.2
-
-        return round(name_size), round(time_size)
+        # 字体大小由共享的布局度量服务按屏幕和课程数量缓存
+        return layoutMetrics().fontSizes(self.total_courses, self.screen_)
 
+    @instrumented('CourseWidget.initUI')
     def initUI(self):
         layout = QHBoxLayout()
 
-        # 计算字体大小
-        name_size, time_size = self.calculateFontSize()
-
-        # 课程名称的字体设置
-        name_font = QFont()
-        name_font.setPointSize(name_size)
-        name_font.setBold(True)
-
-        # 时间的字体设置
-        time_font = QFont()
-        time_font.setPointSize(time_size)
-        time_font.setBold(False)
-
         # 创建并设置课程名称标签
-        self.name_label = QLabel(self.course['name'])
-        self.name_label.setFont(name_font)
+        self.name_label = QLabel(self.course.name)
         self.name_label.setAlignment(Qt.AlignCenter)
+        self.name_label.setProperty('current', False)
         layout.addWidget(self.name_label)
 
         # 创建并设置时间标签
-        self.time_label = QLabel(self.course['time'])
-        self.time_label.setFont(time_font)
+        self.time_label = QLabel(self.course.time)
         self.time_label.setAlignment(Qt.AlignCenter)
         layout.addWidget(self.time_label)
+
+        # 计算并设置字体
+        self.font_sizes = None
+        self.applyFonts()
         # 根据 show_delete_button 控制时间标签的显示
         self.time_label.setVisible(self.show_delete_button)
 
@@ -93,13 +64,60 @@ class CourseWidget(QWidget):
 
         self.setLayout(layout)
 
+    def applyFonts(self):
+        # 字体对象来自共享缓存，只在取整后的字号变化时才重新设置
+        font_sizes = self.calculateFontSize()
+        if font_sizes == self.font_sizes:
+            return
+        self.font_sizes = font_sizes
+        name_font, time_font = layoutMetrics().fonts(self.total_courses, self.screen_)
+        self.name_label.setFont(name_font)
+        self.time_label.setFont(time_font)
+
+    def setScreen(self, screen):
+        self.screen_ = screen
+        self.applyFonts()
+
+    def setCourse(self, course):
+        # 复用组件时更新对应的课程数据，同一 id 的课程被修改后更新文字
+        if course.name != self.course.name:
+            self.name_label.setText(course.name)
+        if course.time != self.course.time:
+            self.time_label.setText(course.time)
+        self.course = course
+
+    def setTotalCourses(self, total_courses):
+        if total_courses != self.total_courses:
+            self.total_courses = total_courses
+            self.applyFonts()
+
+    def setCurrent(self, current):
+        # 高亮状态不变时不做任何事，变化时只重新应用这一个标签的样式
+        if current == self.current:
+            return False
+        self.current = current
+        self.name_label.setProperty('current', current)
+        style = self.name_label.style()
+        style.unpolish(self.name_label)
+        style.polish(self.name_label)
+        self.name_label.update()
+        count('restyles')
+        return True
+
+    def setShowDeleteButton(self, show_delete_button):
+        # 切换编辑/显示模式时只更新可见性，不重建组件
+        self.show_delete_button = show_delete_button
+        self.time_label.setVisible(show_delete_button)
+        self.edit_button.setVisible(show_delete_button)
+        self.delete_button.setVisible(show_delete_button)
+
     def editCourse(self):
-        self.parent().editCourse(self.course)
+        self.window().editCourse(self.course)
 
     def deleteCourse(self):
         reply = QMessageBox.question(self, '确认删除', 
-                                   f"确定要删除课程 '{self.course['name']}' 吗？",
+                                   f"确定要删除课程 '{self.course.name}' 吗？",
                                    QMessageBox.Yes | QMessageBox.No, 
                                    QMessageBox.No)
         if reply == QMessageBox.Yes:
-            self.parent().removeCourse(self.course)
+            self.window().removeCourse(self.course)
@@ -0,0 +1,73 @@
+from PyQt5.QtGui import QPainter, QPixmap, QColor, QPalette
+from PyQt5.QtCore import Qt, QRectF
+from cached_view import CachedPixmapView
+from layout_metrics import layoutMetrics
+from instrumentation import instrumented
+
+
+class DayDisplayView(CachedPixmapView):
+    # 显示模式下一天的课程列表：课程名称和高亮整体绘制在一张缓存的图片上
+    # 窗口被遮挡后重新露出时只需复制图片，课表、高亮、尺寸或 DPI 变化时才重新绘制
+    # 与编辑模式下课程组件的布局一致：行间距和每行的边距
+    ROW_SPACING = 10
+    MARGINS = (10, 5, 10, 5)
+
+    def __init__(self, screen=None, parent=None):
+        super().__init__(parent)
+        self.screen_ = screen
+        self.courses = []
+        self.current = frozenset()
+        # 绘制次数，测试和性能测试据此检查是否多余地重新绘制
+        self.renders = 0
+        # 屏幕或 DPI 真正变化、字体缓存失效时才重新绘制
+        layoutMetrics().metricsChanged.connect(self.invalidate)
+
+    def setCourses(self, courses):
+        if courses == self.courses:
+            return
+        self.courses = list(courses)
+        self.invalidate()
+
+    def setCurrentRows(self, rows):
+        rows = frozenset(rows)
+        if rows == self.current:
+            return
+        self.current = rows
+        self.invalidate()
+
+    def setScreen(self, screen):
+        # 屏幕变化后字体大小可能不同；切换模式或整周视图时屏幕不变，保留缓存图片
+        if screen is self.screen_:
+            return
+        self.screen_ = screen
+        self.invalidate()
+
+    @instrumented('DayDisplayView.render')
+    def renderPixmap(self, ratio):
+        self.renders += 1
+        pixmap = QPixmap(round(self.width() * ratio), round(self.height() * ratio))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.transparent)
+        if not self.courses:
+            return pixmap
+
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.TextAntialiasing)
+        name_font, _ = layoutMetrics().fonts(len(self.courses), self.screen_)
+        painter.setFont(name_font)
+        text_color = self.palette().color(QPalette.WindowText)
+
+        # 各行平分页面高度
+        count = len(self.courses)
+        row_height = (self.height() - self.ROW_SPACING * (count - 1)) / count
+        left, top, right, bottom = self.MARGINS
+        for row, course in enumerate(self.courses):
+            y = row * (row_height + self.ROW_SPACING)
+            rect = QRectF(left, y + top, self.width() - left - right, row_height - top - bottom)
+            # 正在上的课程名称使用黄色背景
+            if row in self.current:
+                painter.fillRect(rect, QColor('yellow'))
+            painter.setPen(text_color)
+            painter.drawText(rect, Qt.AlignCenter, course.name)
+        painter.end()
+        return pixmap
@@ -0,0 +1,180 @@
+from PyQt5.QtWidgets import QWidget, QVBoxLayout
+from course_widget import CourseWidget, HIGHLIGHT_STYLE
+from course_model import CourseListView
+from day_display import DayDisplayView
+from schedule_index import DayIndex
+
+
+class DayPage(QWidget):
+    # 某一天的课程列表页，切换星期时整页缓存复用
+    # 课程数超过该值时改用列表视图绘制，不再为每门课程创建组件
+    LARGE_SCHEDULE_ROWS = 30
+
+    def __init__(self, weekday, show_delete_button, screen=None, parent=None, sort_by_time=False):
+        super().__init__(parent)
+        self.weekday = weekday
+        self.show_delete_button = show_delete_button
+        self.screen_ = screen
+        # 按开始时间显示，大课表总是按时间显示
+        self.sort_by_time = sort_by_time
+        self.courses = []
+        # 显示顺序：每行对应的课程在 courses 中的位置，为 None 时按原顺序显示
+        self.order = None
+        self._rows = None
+        # 当天的索引与存储层共用，索引未变化时沿用已算好的显示顺序
+        self.index = None
+        self._order_key = None
+        self.course_widgets = []
+        # 大课表使用的列表视图，小课表时为 None
+        self.view = None
+        # 显示模式下绘制整个列表的缓存图片视图，编辑模式下为 None
+        self.display = None
+        # 正在上的课程在 courses 中的位置，切换模式重建后重新应用
+        self.current_indices = set()
+        # 页面内容对应的课表版本，版本落后时才需要重新对比
+        self.revision = None
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(10)
+        self.setLayout(layout)
+        # 页面内所有课程共用一份高亮样式
+        self.setStyleSheet(HIGHLIGHT_STYLE)
+
+    def setCourses(self, courses, revision=None, index=None):
+        # index 为存储层中当天的索引，与 courses 不对应时才重新解析
+        if index is None or index.records != courses:
+            index = DayIndex(courses)
+        self.courses = courses
+        self.revision = revision
+        large = len(courses) > self.LARGE_SCHEDULE_ROWS
+        sorted_view = self.sort_by_time or large
+        if (index, sorted_view) != self._order_key:
+            order = None
+            if sorted_view:
+                order = index.sortedIndices()
+                if order == list(range(len(courses))):
+                    order = None
+            self.order = order
+            self._rows = {source: row for row, source in enumerate(order)} if order is not None else None
+            self._order_key = (index, sorted_view)
+        self.index = index
+        shown = [courses[i] for i in self.order] if self.order is not None else courses
+
+        if large:
+            self._removeDisplay()
+            self._setViewCourses(shown)
+        elif not self.show_delete_button:
+            # 显示模式没有可交互的控件，整个列表绘制为一张图片，不为每门课程创建组件
+            self._removeView()
+            self._setDisplayCourses(shown)
+        else:
+            self._removeView()
+            self._removeDisplay()
+            self._reconcileWidgets(shown)
+
+    def setSortByTime(self, sort_by_time):
+        if sort_by_time != self.sort_by_time:
+            self.sort_by_time = sort_by_time
+            self.setCourses(self.courses, self.revision, self.index)
+
+    def _setViewCourses(self, courses):
+        # 列表视图只绘制可见的行，内存和布局开销不随课程数量增长
+        self._reconcileWidgets([])
+        if self.view is None:
+            self.view = CourseListView(self.show_delete_button, self.screen_)
+            self.layout().addWidget(self.view)
+        self.view.setCourses(courses)
+
+    def _setDisplayCourses(self, courses):
+        self._reconcileWidgets([])
+        if self.display is None:
+            self.display = DayDisplayView(self.screen_)
+            self.layout().addWidget(self.display)
+        self.display.setCourses(courses)
+
+    def _removeDisplay(self):
+        if self.display is not None:
+            self.layout().removeWidget(self.display)
+            self.display.hide()
+            self.display.deleteLater()
+            self.display = None
+
+    def _removeView(self):
+        if self.view is not None:
+            self.layout().removeWidget(self.view)
+            self.view.hide()
+            self.view.deleteLater()
+            self.view = None
+
+    def _reconcileWidgets(self, courses):
+        layout = self.layout()
+        total_courses = len(courses)
+        # 课程 id 在修改和重新加载后保持不变，用作组件的标识
+        keys = [course.id for course in courses]
+
+        # 按标识收集现有组件，未再出现的组件被删除
+        existing = {widget.key: widget for widget in self.course_widgets}
+        wanted = set(keys)
+        for key, widget in existing.items():
+            if key not in wanted:
+                layout.removeWidget(widget)
+                widget.hide()
+                widget.deleteLater()
+
+        # 复用未变化的组件，只创建新增的组件，并把位置不对的组件移到正确位置
+        course_widgets = []
+        for i, (key, course) in enumerate(zip(keys, courses)):
+            course_widget = existing.get(key)
+            if course_widget is None:
+                course_widget = CourseWidget(course, self.show_delete_button, total_courses, self.screen_)
+                course_widget.key = key
+                layout.insertWidget(i, course_widget)
+            else:
+                course_widget.setCourse(course)
+                course_widget.setTotalCourses(total_courses)
+                if layout.itemAt(i).widget() is not course_widget:
+                    layout.removeWidget(course_widget)
+                    layout.insertWidget(i, course_widget)
+            course_widgets.append(course_widget)
+        self.course_widgets = course_widgets
+
+    def setCurrentIndices(self, indices):
+        # indices 是课程在 courses 中的位置，按显示顺序换算为行号
+        self.current_indices = indices
+        rows = indices if self._rows is None else {self._rows[i] for i in indices if i in self._rows}
+        if self.display is not None:
+            self.display.setCurrentRows(rows)
+            return
+        if self.view is not None:
+            self.view.setCurrentIndices(rows)
+            return
+        # 只有进入或离开上课状态的行才会重新应用样式
+        for row, course_widget in enumerate(self.course_widgets):
+            course_widget.setCurrent(row in rows)
+
+    def setShowDeleteButton(self, show_delete_button):
+        if show_delete_button != self.show_delete_button and len(self.courses) <= self.LARGE_SCHEDULE_ROWS:
+            # 小课表在课程组件和缓存图片之间切换，重建后恢复高亮
+            self.show_delete_button = show_delete_button
+            self.setCourses(self.courses, self.revision, self.index)
+            self.setCurrentIndices(self.current_indices)
+            return
+        self.show_delete_button = show_delete_button
+        for course_widget in self.course_widgets:
+            course_widget.setShowDeleteButton(show_delete_button)
+        if self.view is not None:
+            self.view.setShowDeleteButton(show_delete_button)
+
+    def setScreen(self, screen):
+        self.screen_ = screen
+        for course_widget in self.course_widgets:
+            course_widget.setScreen(screen)
+        if self.view is not None:
+            self.view.setScreen(screen)
+        if self.display is not None:
+            self.display.setScreen(screen)
+
+    def rowCount(self):
+        # 列表视图和缓存图片的开销与课程数量无关，按一行计算
+        return len(self.course_widgets) + (1 if self.view is not None else 0) + (1 if self.display is not None else 0)
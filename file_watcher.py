@@ -0,0 +1,61 @@
+import os
+from PyQt5.QtCore import QObject, QFileSystemWatcher, QCoreApplication
+
+
+class FileWatcher(QObject):
+    # 进程内共用的文件监视：同一路径只监视一次，变化时通知所有订阅者
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._onChanged)
+        self._watcher.directoryChanged.connect(self._onChanged)
+        self._callbacks = {}
+        self._owners = set()
+
+    def watch(self, path, callback):
+        # 可以重复调用：文件被删除或整体替换后监视会失效，重新出现时再次添加
+        path = os.path.abspath(path)
+        callbacks = self._callbacks.setdefault(path, [])
+        if callback not in callbacks:
+            callbacks.append(callback)
+            self._forgetOnDestroyed(getattr(callback, '__self__', None))
+        if os.path.exists(path) and path not in self._watcher.files() and path not in self._watcher.directories():
+            self._watcher.addPath(path)
+
+    def unwatch(self, path, callback):
+        path = os.path.abspath(path)
+        callbacks = self._callbacks.get(path, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+        if not callbacks:
+            self._callbacks.pop(path, None)
+            if path in self._watcher.files() or path in self._watcher.directories():
+                self._watcher.removePath(path)
+
+    def _forgetOnDestroyed(self, owner):
+        # 订阅者销毁后自动取消它的所有订阅
+        if not isinstance(owner, QObject) or id(owner) in self._owners:
+            return
+        self._owners.add(id(owner))
+        owner.destroyed.connect(lambda: self._forget(owner))
+
+    def _forget(self, owner):
+        self._owners.discard(id(owner))
+        for path, callbacks in list(self._callbacks.items()):
+            for callback in [callback for callback in callbacks if getattr(callback, '__self__', None) is owner]:
+                self.unwatch(path, callback)
+
+    def _onChanged(self, path):
+        for callback in list(self._callbacks.get(path, [])):
+            callback(path)
+
+
+_instance = None
+
+
+def fileWatcher():
+    # 所有窗口和课表存储共用一个实例
+    global _instance
+    if _instance is None:
+        _instance = FileWatcher(QCoreApplication.instance())
+    return _instance
@@ -0,0 +1,139 @@
+from PyQt5.QtCore import QObject, QTimer, QDateTime, QTime, QElapsedTimer, Qt, pyqtSignal
+
+
+class SystemClock:
+    def now(self):
+        return QDateTime.currentDateTime()
+
+
+class ManualClock:
+    # 测试模式使用的时钟：时间只在手动推进时变化，无需真实等待
+    def __init__(self, start=None):
+        self._now = QDateTime(start) if start is not None else QDateTime.currentDateTime()
+        self._listeners = []
+
+    def now(self):
+        return QDateTime(self._now)
+
+    def subscribe(self, callback):
+        self._listeners.append(callback)
+
+    def setNow(self, value):
+        self._now = QDateTime(value)
+        for callback in list(self._listeners):
+            callback()
+
+    def advance(self, seconds):
+        self.setNow(self._now.addSecs(seconds))
+
+
+class HighlightScheduler(QObject):
+    # 到达某节课的开始或结束时间时发出
+    boundaryReached = pyqtSignal()
+    # 日期变化（跨过午夜）时发出，参数为新的星期数
+    dayChanged = pyqtSignal(int)
+
+    # 检测系统时间跳变或休眠唤醒的间隔及容差
+    WATCHDOG_INTERVAL_MS = 60 * 1000
+    JUMP_TOLERANCE_MS = 5 * 1000
+
+    def __init__(self, parent=None, clock=None):
+        super().__init__(parent)
+        self.clock = clock if clock is not None else SystemClock()
+        self._boundaries = []
+        # 多个窗口共用一个调度器时，每个窗口各自登记当天的上下课时间点
+        self._day_boundaries = {}
+        self._date = self.clock.now().date()
+        self._next_fire = None
+        self._armed_at = None
+
+        if hasattr(self.clock, 'subscribe'):
+            # 测试模式：由时钟推进驱动，不启动真实定时器
+            self._timer = None
+            self._watchdog = None
+            self.clock.subscribe(self._onClockAdvanced)
+            return
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.timeout.connect(self._onTimeout)
+
+        # 低频看门狗：比较单调时钟与墙上时钟，发现跳变后重新计算
+        self._elapsed = QElapsedTimer()
+        self._wall_reference = None
+        self._watchdog = QTimer(self)
+        self._watchdog.setTimerType(Qt.VeryCoarseTimer)
+        self._watchdog.timeout.connect(self._checkClockJump)
+        self._watchdog.start(self.WATCHDOG_INTERVAL_MS)
+        self._resetJumpReference()
+
+    def now(self):
+        return self.clock.now()
+
+    def currentTime(self):
+        return self.clock.now().time()
+
+    def weekday(self):
+        return self.clock.now().date().dayOfWeek()
+
+    def setDayIndex(self, day_index, owner=None):
+        # 课程变化后使用当天索引中的所有上下课时间点，多个窗口的时间点合并
+        self._day_boundaries[owner] = day_index.boundaries
+        self._updateBoundaries()
+
+    def removeDayIndex(self, owner):
+        if self._day_boundaries.pop(owner, None) is not None:
+            self._updateBoundaries()
+
+    def _updateBoundaries(self):
+        if len(self._day_boundaries) == 1:
+            self._boundaries = next(iter(self._day_boundaries.values()))
+        else:
+            self._boundaries = sorted(set().union(*self._day_boundaries.values()))
+        self.rearm()
+
+    def nextBoundary(self):
+        now = self.clock.now()
+        seconds = QTime(0, 0).secsTo(now.time())
+        for minute in self._boundaries:
+            if minute * 60 > seconds:
+                return QDateTime(now.date(), QTime(minute // 60, minute % 60))
+        # 当天没有更多边界时，在午夜重新计算
+        return QDateTime(now.date().addDays(1), QTime(0, 0))
+
+    def rearm(self):
+        self._armed_at = self.clock.now()
+        self._next_fire = self.nextBoundary()
+        if self._timer is None:
+            return
+        delay = max(0, self.clock.now().msecsTo(self._next_fire))
+        self._timer.start(delay)
+        self._resetJumpReference()
+
+    def _resetJumpReference(self):
+        self._elapsed.start()
+        self._wall_reference = self.clock.now()
+
+    def _checkClockJump(self):
+        expected = self._wall_reference.addMSecs(self._elapsed.elapsed())
+        drift = abs(expected.msecsTo(self.clock.now()))
+        if drift > self.JUMP_TOLERANCE_MS:
+            self._onTimeout()
+        else:
+            self._resetJumpReference()
+
+    def _onClockAdvanced(self):
+        now = self.clock.now()
+        # 时间向后拨或到达下一个边界时才需要处理
+        if self._next_fire is not None and self._armed_at <= now < self._next_fire:
+            return
+        self._onTimeout()
+
+    def _onTimeout(self):
+        today = self.clock.now().date()
+        if today != self._date:
+            self._date = today
+            self.dayChanged.emit(today.dayOfWeek())
+        self.boundaryReached.emit()
+        self.rearm()
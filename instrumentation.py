@@ -0,0 +1,144 @@
+import os
+import json
+import time
+import functools
+from bisect import bisect_left
+
+# 设置环境变量 COURSE_INSTRUMENT=1 或使用 --instrument 启动时开启
+# 关闭时装饰器直接返回原函数，没有额外开销
+ENABLED = os.environ.get('COURSE_INSTRUMENT', '') not in ('', '0')
+DUMP_PATH = os.environ.get('COURSE_INSTRUMENT_FILE', 'diagnostics.json')
+DUMP_INTERVAL_MS = int(os.environ.get('COURSE_INSTRUMENT_INTERVAL', '60')) * 1000
+
+# 延迟直方图的桶上限（毫秒），最后一个桶收集更慢的调用
+BUCKETS_MS = [0.1, 1, 10, 100, 1000]
+
+_started = time.time()
+_calls = {}
+_counters = {
+    'bytes_read': 0,
+    'bytes_written': 0,
+    'widgets_created': 0,
+    'widgets_destroyed': 0,
+    'restyles': 0,
+}
+
+
+def record(name, elapsed_ms):
+    stats = _calls.get(name)
+    if stats is None:
+        stats = _calls[name] = {'calls': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'histogram': [0] * (len(BUCKETS_MS) + 1)}
+    stats['calls'] += 1
+    stats['total_ms'] += elapsed_ms
+    stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+    stats['histogram'][bisect_left(BUCKETS_MS, elapsed_ms)] += 1
+
+
+def instrumented(name):
+    # 记录被装饰函数的调用次数和耗时
+    def decorate(func):
+        if not ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, (time.perf_counter() - start) * 1000)
+        return wrapper
+    return decorate
+
+
+def count(counter, amount=1):
+    if ENABLED:
+        _counters[counter] += amount
+
+
+def trackWidget(widget):
+    # 统计组件的创建和销毁次数
+    if not ENABLED:
+        return
+    _counters['widgets_created'] += 1
+    widget.destroyed.connect(_onWidgetDestroyed)
+
+
+def _onWidgetDestroyed(*args):
+    _counters['widgets_destroyed'] += 1
+
+
+def snapshot():
+    labels = [f"<{bound}ms" for bound in BUCKETS_MS] + [f">={BUCKETS_MS[-1]}ms"]
+    calls = {}
+    for name, stats in sorted(_calls.items()):
+        calls[name] = {
+            'calls': stats['calls'],
+            'avg_ms': stats['total_ms'] / stats['calls'],
+            'max_ms': stats['max_ms'],
+            'histogram': dict(zip(labels, stats['histogram'])),
+        }
+    return {
+        'uptime_s': round(time.time() - _started, 1),
+        'calls': calls,
+        'counters': dict(_counters),
+    }
+
+
+def dump(path=None):
+    path = path or DUMP_PATH
+    try:
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(snapshot(), file, ensure_ascii=False, indent=4)
+    except OSError as e:
+        print(f"写入诊断数据时发生错误: {e}")
+
+
+def summary():
+    lines = []
+    for name, stats in snapshot()['calls'].items():
+        lines.append(f"{name}: {stats['calls']} 次, 平均 {stats['avg_ms']:.2f} ms, 最长 {stats['max_ms']:.2f} ms")
+    lines.extend(f"{name}: {value}" for name, value in _counters.items())
+    return '\n'.join(lines)
+
+
+def installDiagnostics(window):
+    # 开启时定期写出诊断文件，并提供 Ctrl+Shift+D 切换的隐藏调试浮层
+    if not ENABLED:
+        return None
+    from PyQt5.QtWidgets import QApplication, QLabel, QShortcut
+    from PyQt5.QtGui import QKeySequence
+    from PyQt5.QtCore import QTimer, Qt
+
+    dump_timer = QTimer(window)
+    dump_timer.timeout.connect(dump)
+    dump_timer.start(DUMP_INTERVAL_MS)
+    QApplication.instance().aboutToQuit.connect(dump)
+
+    overlay = QLabel(window)
+    overlay.setStyleSheet('background-color: rgba(0, 0, 0, 180); color: white; font-family: monospace;')
+    overlay.setAlignment(Qt.AlignLeft | Qt.AlignTop)
+    overlay.setWordWrap(True)
+    overlay.hide()
+
+    # 浮层可见时每秒刷新一次，隐藏时不刷新
+    overlay_timer = QTimer(overlay)
+
+    def refreshOverlay():
+        overlay.setText(summary())
+        overlay.setGeometry(window.rect())
+        overlay.raise_()
+
+    def toggleOverlay():
+        if overlay.isVisible():
+            overlay.hide()
+            overlay_timer.stop()
+        else:
+            refreshOverlay()
+            overlay.show()
+            overlay_timer.start(1000)
+
+    overlay_timer.timeout.connect(refreshOverlay)
+    shortcut = QShortcut(QKeySequence('Ctrl+Shift+D'), window)
+    shortcut.activated.connect(toggleOverlay)
+    return overlay
@@ -0,0 +1,129 @@
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QTimer, QCoreApplication, pyqtSignal
+
+
+class _JobSignals(QObject):
+    # 在工作线程中发出，排队送回 GUI 线程
+    done = pyqtSignal(object, object, object)
+
+
+class _Job(QRunnable):
+    def __init__(self, key, func, args, signals):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.key = key
+        self.func = func
+        self.args = args
+        self.signals = signals
+        self.started = False
+        # 运行期间又收到同一请求时，结束后用最新参数再运行一次
+        self.rerun = False
+        self.timer = None
+
+    def run(self):
+        self.started = True
+        try:
+            result, error = self.func(*self.args), None
+        except Exception as e:
+            result, error = None, e
+        self.signals.done.emit(self, result, error)
+
+
+class IoWorker(QObject):
+    # 文件读写在线程池中进行，结果通过信号送回 GUI 线程
+    finished = pyqtSignal(object, object)
+    failed = pyqtSignal(object, object)
+    timedOut = pyqtSignal(object)
+
+    def __init__(self, parent=None, max_threads=2):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        self._signals = _JobSignals(self)
+        self._signals.done.connect(self._onDone)
+        # 每个键最多一个未完成的任务
+        self._jobs = {}
+        # 线程池持有的任务在运行结束前必须保留引用，包括已超时或取消的任务
+        self._running = set()
+
+    def submit(self, key, func, *args, timeout_ms=0):
+        # 同一键已有未完成的任务时合并：排队中的任务改用最新参数，运行中的任务结束后再运行一次
+        job = self._jobs.get(key)
+        if job is not None:
+            job.func, job.args = func, args
+            if job.started:
+                job.rerun = True
+            return
+        job = _Job(key, func, args, self._signals)
+        if timeout_ms > 0:
+            job.timer = QTimer(self)
+            job.timer.setSingleShot(True)
+            job.timer.setInterval(timeout_ms)
+            job.timer.timeout.connect(lambda: self._onTimeout(job))
+            job.timer.start()
+        self._jobs[key] = job
+        self._running.add(job)
+        self.pool.start(job)
+
+    def isPending(self, key):
+        return key in self._jobs
+
+    def cancel(self, key):
+        # 排队中的任务直接移除，运行中的任务结果被丢弃
+        job = self._jobs.pop(key, None)
+        if job is None:
+            return False
+        self._stopTimer(job)
+        if self.pool.tryTake(job):
+            self._running.discard(job)
+        return True
+
+    def waitForIdle(self, timeout_ms=-1):
+        # 等待所有任务完成并立即处理结果，只在退出或测试时使用
+        while True:
+            finished = self.pool.waitForDone(timeout_ms)
+            QCoreApplication.sendPostedEvents()
+            if not finished or not self._jobs:
+                return finished and not self._jobs
+
+    def _stopTimer(self, job):
+        if job.timer is not None:
+            job.timer.stop()
+            job.timer.deleteLater()
+            job.timer = None
+
+    def _onTimeout(self, job):
+        # 超时的任务不再等待，之后送达的结果被丢弃，调用方继续使用已有数据
+        if self._jobs.get(job.key) is job:
+            del self._jobs[job.key]
+            self._stopTimer(job)
+            self.timedOut.emit(job.key)
+
+    def _onDone(self, job, result, error):
+        if self._jobs.get(job.key) is not job:
+            self._running.discard(job)
+            return
+        if job.rerun:
+            job.started = job.rerun = False
+            if job.timer is not None:
+                job.timer.start()
+            self.pool.start(job)
+            return
+        del self._jobs[job.key]
+        self._running.discard(job)
+        self._stopTimer(job)
+        if error is not None:
+            self.failed.emit(job.key, error)
+        else:
+            self.finished.emit(job.key, result)
+
+
+_instance = None
+
+
+def ioWorker():
+    # 模式文件和自启动脚本等零散读写共用一个实例
+    global _instance
+    if _instance is None:
+        _instance = IoWorker(QApplication.instance())
+    return _instance
@@ -0,0 +1,121 @@
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtGui import QFont
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+class LayoutMetrics(QObject):
+    # 屏幕配置或 DPI 变化、缓存失效时发出
+    metricsChanged = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._font_sizes = {}
+        self._fonts = {}
+
+        app = QApplication.instance()
+        app.screenAdded.connect(self._onScreenAdded)
+        app.screenRemoved.connect(self.invalidate)
+        app.primaryScreenChanged.connect(self.invalidate)
+        for screen in app.screens():
+            self._watchScreen(screen)
+
+    def _watchScreen(self, screen):
+        screen.geometryChanged.connect(self.invalidate)
+        screen.logicalDotsPerInchChanged.connect(self.invalidate)
+        screen.physicalDotsPerInchChanged.connect(self.invalidate)
+
+    def _onScreenAdded(self, screen):
+        self._watchScreen(screen)
+        self.invalidate()
+
+    def invalidate(self, *args):
+        self._font_sizes.clear()
+        self._fonts.clear()
+        self.metricsChanged.emit()
+
+    def screenFor(self, widget=None):
+        # 优先使用窗口所在的屏幕，而不是总假定主屏幕
+        screen = None
+        if widget is not None:
+            handle = widget.window().windowHandle()
+            if handle is not None:
+                screen = handle.screen()
+            if screen is None:
+                screen = QApplication.screenAt(widget.window().geometry().center())
+        return screen or QApplication.primaryScreen()
+
+    def screenGeometry(self, screen=None):
+        return (screen or QApplication.primaryScreen()).geometry()
+
+    def _cacheKey(self, total_courses, screen):
+        screen = screen or QApplication.primaryScreen()
+        geometry = screen.geometry()
+        return screen.name(), geometry.width(), geometry.height(), screen.logicalDotsPerInch(), total_courses
+
+    def fontSizes(self, total_courses, screen=None):
+        key = self._cacheKey(total_courses, screen)
+        sizes = self._font_sizes.get(key)
+        if sizes is None:
+            sizes = self._font_sizes[key] = self._calculateFontSizes(total_courses, self.screenGeometry(screen))
+        return sizes
+
+    def fonts(self, total_courses, screen=None):
+        # 同一屏幕、同样课程数量的所有课程共用同一组字体对象
+        key = self._cacheKey(total_courses, screen)
+        fonts = self._fonts.get(key)
+        if fonts is None:
+            name_size, time_size = self.fontSizes(total_courses, screen)
+
+            # 课程名称的字体设置
+            name_font = QFont()
+            name_font.setPointSize(name_size)
+            name_font.setBold(True)
+
+            # 时间的字体设置
+            time_font = QFont()
+            time_font.setPointSize(time_size)
+            time_font.setBold(False)
+
+            fonts = self._fonts[key] = (name_font, time_font)
+        return fonts
+
+    def _calculateFontSizes(self, total_courses, screen):
+        screen_height = screen.height()
+        screen_width = screen.width()
+        total_courses = max(total_courses, 1)
+
+        # 计算基础字体大小
+        # 考虑屏幕高度、宽度和课程数量
+        base_size = min(screen_height / (total_courses * 3), screen_width / 50)
+
+        # 根据不同的屏幕分辨率范围调整字体大小
+        if screen_height <= 768:  # 小屏幕
+            name_size = max(12, min(base_size * 0.8, 18))
+            time_size = max(8, min(base_size * 0.4, 12))
+        elif screen_height <= 1080:  # 中等屏幕
+            name_size = max(16, min(base_size * 0.9, 24))
+            time_size = max(10, min(base_size * 0.5, 14))
+        else:  # 大屏幕
+            name_size = max(20, min(base_size, 32))
+            time_size = max(12, min(base_size * 0.6, 16))
+
+        # 根据课程数量进行微调
+        if total_courses > 7:
+            name_size *= 0.85
+            time_size *= 0.85
+        elif total_courses < 4:
+            name_size *= 1.2
+            time_size *= 1.2
+
+        return round(name_size), round(time_size)
+
+
+_instance = None
+
+
+def layoutMetrics():
+    # 整个进程共用一个实例
+    global _instance
+    if _instance is None:
+        _instance = LayoutMetrics(QApplication.instance())
+    return _instance
@@ -1,13 +1,64 @@
 import sys
-from PyQt5.QtWidgets import QApplication
-from course_widget import CourseWidget  # 导入CourseWidget
-from app import CourseScheduleApp        # 导入CourseScheduleApp
-import json
+import time
+
+_start = time.perf_counter()
 
 if __name__ == '__main__':
+    # --profile-startup 输出启动各阶段的耗时
+    profile = None
+    if '--profile-startup' in sys.argv:
+        sys.argv.remove('--profile-startup')
+        from startup_profile import StartupProfile
+        profile = StartupProfile(_start)
+
+    # --instrument 开启性能诊断，需在导入 app 之前设置
+    if '--instrument' in sys.argv:
+        sys.argv.remove('--instrument')
+        import os
+        os.environ['COURSE_INSTRUMENT'] = '1'
+
+    # --show/--reload/--edit/--display 转发给正在运行的实例，默认为 --show
+    command = None
+    for option in ('--show', '--reload', '--edit', '--display'):
+        if option in sys.argv:
+            sys.argv.remove(option)
+            command = option[2:]
+
+    # --profiles 目录1 目录2 ... 在一个进程中为每个目录打开一个课表窗口，需放在最后
+    directories = []
+    if '--profiles' in sys.argv:
+        index = sys.argv.index('--profiles')
+        directories = sys.argv[index + 1:]
+        del sys.argv[index:]
+
+    # 已有实例在运行时只转发命令并退出，不创建窗口
+    from single_instance import InstanceServer, sendCommand, CONNECT_RETRY_MS
+    instance = InstanceServer()
+    if not instance.tryLock():
+        from PyQt5.QtCore import QCoreApplication
+        app = QCoreApplication(sys.argv)
+        if sendCommand(command or 'show', instance.name, retry_ms=CONNECT_RETRY_MS) is None:
+            print("课表程序已在运行，但无法连接")
+            sys.exit(1)
+        sys.exit(0)
+
+    from PyQt5.QtWidgets import QApplication
+    from app import CourseScheduleApp        # 导入CourseScheduleApp
+    if profile is not None:
+        profile.mark('imports')
+
     app = QApplication(sys.argv)
-    ex = CourseScheduleApp()
+    if directories:
+        from schedule_host import ScheduleHost
+        ex = ScheduleHost(directories)
+    else:
+        ex = CourseScheduleApp(profile=profile)
+    instance.commandReceived.connect(ex.handleCommand)
+    instance.listen()
+    app.aboutToQuit.connect(instance.close)
     ex.show()
+    if command is not None and command != 'show':
+        ex.handleCommand(command)
     sys.exit(app.exec_())
 #build pyinstaller --noconfirm --clean --windowed --name "Course" --noupx --onefile --add-data "course_widget.py;." --add-data "app.py;." main.py
-#   
\ No newline at end of file
+#
@@ -0,0 +1,49 @@
+from PyQt5.QtWidgets import QUndoCommand
+from course_record import CourseRecord
+
+
+class ScheduleEdit(QUndoCommand):
+    # 一次修改：记录涉及的每一天修改前后的课程列表
+    # 无论涉及多少门课程和多少天，执行、撤销和重做都只保存一次、刷新一次
+    def __init__(self, window, text, days):
+        super().__init__(text)
+        self.window = window
+        self.after = {str(weekday): list(courses) for weekday, courses in days.items()}
+        self.before = {weekday: window.store.courses(weekday) for weekday in self.after}
+
+    def redo(self):
+        self.window.applyDays(self.after)
+
+    def undo(self):
+        self.window.applyDays(self.before)
+
+
+def renumber(courses):
+    # 位置按列表顺序重新编号，位置没有变化的课程记录保持不变
+    return [course if course.position == position else course.replace(position=position)
+            for position, course in enumerate(courses, start=1)]
+
+
+def reorderDay(courses, ids):
+    # 按 ids 的顺序排列课程，不在 ids 中的课程被删除
+    by_id = {course.id: course for course in courses}
+    return renumber([by_id[course_id] for course_id in ids if course_id in by_id])
+
+
+def removeCourses(courses, ids):
+    ids = set(ids)
+    return [course for course in courses if course.id not in ids]
+
+
+def copyDay(courses):
+    # 复制的课程使用新的 id，与原来的课程互不影响
+    return [CourseRecord(course.name, course.time, course.position) for course in courses]
+
+
+def replaceName(days, old, new):
+    # 在多天的课程中把名称为 old 的课程改为 new，只返回有变化的星期
+    changed = {}
+    for weekday, courses in days.items():
+        if any(course.name == old for course in courses):
+            changed[weekday] = [course.replace(name=new) if course.name == old else course for course in courses]
+    return changed
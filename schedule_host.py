@@ -0,0 +1,39 @@
+from PyQt5.QtCore import QObject
+from highlight_scheduler import HighlightScheduler
+from app import CourseScheduleApp
+
+
+class ScheduleHost(QObject):
+    # 在一个进程中为多个课表目录各打开一个窗口
+    # 窗口共用高亮调度器、文件监视和字体缓存，每个窗口使用各自目录中的课表文件和 change.txt
+    # 窗口之间的间距
+    SPACING = 10
+
+    def __init__(self, directories, clock=None, parent=None):
+        super().__init__(parent)
+        self.scheduler = HighlightScheduler(self, clock)
+        self.windows = []
+        for directory in directories:
+            self.addWindow(directory)
+
+    def addWindow(self, directory):
+        window = CourseScheduleApp(data_dir=directory, host=self)
+        self.windows.append(window)
+        self.arrangeWindows()
+        return window
+
+    def arrangeWindows(self):
+        # 从屏幕右上角开始向左依次排列
+        right_margin = self.SPACING
+        for window in self.windows:
+            window.placeWindow(right_margin)
+            right_margin += window.width() + self.SPACING
+
+    def show(self):
+        for window in self.windows:
+            window.show()
+
+    def handleCommand(self, command):
+        # 单实例命令对所有窗口生效
+        for window in self.windows:
+            window.handleCommand(command)
@@ -0,0 +1,277 @@
+import os
+import re
+import sys
+import csv
+import argparse
+from datetime import datetime, timezone
+from schedule_index import DayIndex, parseTimeRange, formatMinutes, describeConflict
+from storage import openBackend
+from course_record import CourseRecord, recordsFromData, dataFromRecords
+
+ICS_WEEKDAYS = {'MO': 1, 'TU': 2, 'WE': 3, 'TH': 4, 'FR': 5, 'SA': 6, 'SU': 7}
+CSV_WEEKDAYS = {
+    '星期一': 1, '星期二': 2, '星期三': 3, '星期四': 4, '星期五': 5, '星期六': 6, '星期日': 7, '星期天': 7,
+    '周一': 1, '周二': 2, '周三': 3, '周四': 4, '周五': 5, '周六': 6, '周日': 7, '周天': 7,
+    'mon': 1, 'tue': 2, 'wed': 3, 'thu': 4, 'fri': 5, 'sat': 6, 'sun': 7,
+    'monday': 1, 'tuesday': 2, 'wednesday': 3, 'thursday': 4, 'friday': 5, 'saturday': 6, 'sunday': 7,
+}
+# CSV 表头的可选写法
+CSV_COLUMNS = {
+    'weekday': ('weekday', 'day', '星期'),
+    'name': ('name', 'subject', '课程', '课程名称'),
+    'time': ('time', '时间'),
+    'start': ('start', '开始', '开始时间'),
+    'end': ('end', '结束', '结束时间'),
+    'position': ('position', '位置', '节次'),
+}
+DURATION_PATTERN = re.compile(r'^P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?)?$')
+# 每读取这么多字节报告一次进度
+PROGRESS_STEP = 64 * 1024
+
+
+class RecordError(ValueError):
+    pass
+
+
+def readLines(path, progress=None):
+    # 逐行读取文件，按已读取的字节数报告进度，不把整个文件读入内存
+    total = os.path.getsize(path)
+    done = reported = 0
+    with open(path, 'rb') as file:
+        for number, raw in enumerate(file, start=1):
+            done += len(raw)
+            if progress is not None and done - reported >= PROGRESS_STEP:
+                progress(done, total)
+                reported = done
+            text = raw.decode('utf-8', errors='replace')
+            if number == 1:
+                text = text.lstrip('﻿')
+            yield number, text
+    if progress is not None:
+        progress(total, total)
+
+
+def unfoldIcsLines(lines):
+    # iCalendar 的长行会被折成以空格或制表符开头的续行
+    pending = None
+    for number, text in lines:
+        text = text.rstrip('\r\n')
+        if text[:1] in (' ', '\t') and pending is not None:
+            pending = (pending[0], pending[1] + text[1:])
+            continue
+        if pending is not None:
+            yield pending
+        pending = (number, text)
+    if pending is not None:
+        yield pending
+
+
+def iterIcsRecords(lines):
+    # 每个 VEVENT 产生一条记录：(起始行号, {属性名: (参数, 值)})
+    event = None
+    for number, text in unfoldIcsLines(lines):
+        upper = text.upper()
+        if upper == 'BEGIN:VEVENT':
+            event, start_line = {}, number
+        elif upper == 'END:VEVENT':
+            if event is not None:
+                yield start_line, event
+            event = None
+        elif event is not None and ':' in text:
+            name, value = text.split(':', 1)
+            key, *params = name.split(';')
+            event[key.upper()] = ([param.upper() for param in params], value)
+
+
+def _icsText(value):
+    return (value.replace('\\n', ' ').replace('\\N', ' ').replace('\\,', ',')
+            .replace('\\;', ';').replace('\\\\', '\\').strip())
+
+
+def _icsDateTime(params, value):
+    if 'VALUE=DATE' in params or 'T' not in value:
+        raise RecordError("全天事件没有上课时间")
+    try:
+        moment = datetime.strptime(value.rstrip('Z'), '%Y%m%dT%H%M%S')
+    except ValueError:
+        raise RecordError(f"无效的时间: {value!r}")
+    if value.endswith('Z'):
+        # UTC 时间换算为本地时间
+        moment = moment.replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    return moment
+
+
+def icsCourses(event):
+    # 把每周重复的事件转换为 [(星期, 课程名称, 时间段, 位置)]
+    if 'SUMMARY' not in event or not _icsText(event['SUMMARY'][1]):
+        raise RecordError("缺少课程名称")
+    if 'DTSTART' not in event:
+        raise RecordError("缺少开始时间")
+    name = _icsText(event['SUMMARY'][1])
+    start = _icsDateTime(*event['DTSTART'])
+    if 'DTEND' in event:
+        end = _icsDateTime(*event['DTEND'])
+        if end.date() != start.date():
+            raise RecordError("课程跨越了午夜")
+        end_minute = end.hour * 60 + end.minute
+    elif 'DURATION' in event:
+        match = DURATION_PATTERN.match(event['DURATION'][1])
+        if match is None:
+            raise RecordError(f"无效的时长: {event['DURATION'][1]!r}")
+        days, hours, minutes = (int(part or 0) for part in match.groups())
+        end_minute = start.hour * 60 + start.minute + (days * 24 + hours) * 60 + minutes
+    else:
+        raise RecordError("缺少结束时间")
+    if end_minute >= 24 * 60:
+        raise RecordError("课程跨越了午夜")
+    time_range = f"{formatMinutes(start.hour * 60 + start.minute)}-{formatMinutes(end_minute)}"
+    parseTimeRange(time_range)
+
+    if 'RRULE' not in event:
+        raise RecordError("不是每周重复的事件")
+    rule = dict(part.split('=', 1) for part in event['RRULE'][1].upper().split(';') if '=' in part)
+    if rule.get('FREQ') != 'WEEKLY' or rule.get('INTERVAL', '1') != '1':
+        raise RecordError(f"不是每周重复的事件: {event['RRULE'][1]}")
+    if 'BYDAY' in rule:
+        weekdays = []
+        for day in rule['BYDAY'].split(','):
+            if day[-2:] not in ICS_WEEKDAYS:
+                raise RecordError(f"无效的星期: {day!r}")
+            weekdays.append(ICS_WEEKDAYS[day[-2:]])
+    else:
+        weekdays = [start.isoweekday()]
+    return [(weekday, name, time_range, None) for weekday in weekdays]
+
+
+def iterCsvRecords(lines):
+    # 第一行为表头，之后每行产生一条记录：(行号, {字段: 值})
+    texts = (text for _, text in lines)
+    reader = csv.reader(texts)
+    header = next(reader, None)
+    if header is None:
+        return
+    header = [column.strip().lower() for column in header]
+    columns = {}
+    for field, aliases in CSV_COLUMNS.items():
+        for alias in aliases:
+            if alias in header:
+                columns[field] = header.index(alias)
+                break
+    if 'weekday' not in columns or 'name' not in columns or not ('time' in columns or {'start', 'end'} <= set(columns)):
+        raise ValueError(f"CSV 表头缺少星期、课程或时间列: {header}")
+    for row in reader:
+        if not any(cell.strip() for cell in row):
+            continue
+        yield reader.line_num, {field: row[index].strip() if index < len(row) else '' for field, index in columns.items()}
+
+
+def csvCourses(row):
+    weekday = row['weekday']
+    weekday = int(weekday) if weekday.isdigit() else CSV_WEEKDAYS.get(weekday.lower())
+    if weekday is None or not 1 <= weekday <= 7:
+        raise RecordError(f"无效的星期: {row['weekday']!r}")
+    if not row['name']:
+        raise RecordError("缺少课程名称")
+    time_range = row.get('time') or f"{row.get('start', '')}-{row.get('end', '')}"
+    parseTimeRange(time_range)
+    position = row.get('position') or None
+    if position is not None:
+        if not position.isdigit():
+            raise RecordError(f"无效的位置: {position!r}")
+        position = int(position)
+    return [(weekday, row['name'], time_range, position)]
+
+
+def _printError(line, error):
+    print(f"第{line}行: {error}")
+
+
+def _printConflict(weekday, courses, group):
+    print(f"星期{weekday} 课程时间重叠: {describeConflict(courses, group)}")
+
+
+def importSchedule(source, target='courses.json', replace=False, progress=None, on_error=_printError,
+                   on_conflict=_printConflict, **backend_options):
+    # 流式读取 .ics/.csv，按星期收集课程后一次性写入存储
+    # 同一星期、名称和时间的课程只保留一门，内存占用只与导入后的课表大小有关
+    if os.path.splitext(source)[1].lower() == '.ics':
+        records, convert = iterIcsRecords(readLines(source, progress)), icsCourses
+    else:
+        records, convert = iterCsvRecords(readLines(source, progress)), csvCourses
+
+    imported = {}
+    seen = set()
+    errors = 0
+    for line, record in records:
+        try:
+            courses = convert(record)
+        except ValueError as e:
+            errors += 1
+            on_error(line, e)
+            continue
+        for weekday, name, time_range, position in courses:
+            if (weekday, name, time_range) in seen:
+                continue
+            seen.add((weekday, name, time_range))
+            imported.setdefault(str(weekday), []).append((position, parseTimeRange(time_range)[0], name, time_range))
+
+    backend = openBackend(target, **backend_options)
+    try:
+        data, _ = backend.load()
+        # 已有课程保留原来的 id，新导入的课程分配新的 id
+        records, _ = recordsFromData(data)
+        for weekday, courses in imported.items():
+            # 有位置的课程按位置排列，其余按开始时间排在后面
+            courses.sort(key=lambda course: (course[0] is None, course[0] or 0, course[1]))
+            existing = [] if replace else records.get(weekday, [])
+            known = {(course.name, course.time) for course in existing}
+            day = list(existing)
+            for _, _, name, time_range in courses:
+                course = CourseRecord(name, time_range)
+                if (course.name, course.time) not in known:
+                    day.append(course)
+            day = [course.replace(position=position) for position, course in enumerate(day, start=1)]
+            records[weekday] = day
+            # 导入后的整天课表一次性检查时间重叠
+            for group in DayIndex(day).conflicts:
+                on_conflict(weekday, day, group)
+        # 所有星期在一次保存中写入
+        backend.save(dataFromRecords(records), sorted(imported))
+    finally:
+        backend.close()
+    return sum(len(courses) for courses in imported.values()), errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='从 iCalendar(.ics) 或 CSV 文件导入课表')
+    parser.add_argument('source', help='.ics 或 .csv 文件')
+    parser.add_argument('--target', default='courses.json', help='课表文件，.db 为 SQLite 数据库')
+    parser.add_argument('--replace', action='store_true', help='替换导入文件中出现的星期，而不是追加')
+    parser.add_argument('--profile', default='default')
+    parser.add_argument('--term', default='default')
+    parser.add_argument('--quiet', action='store_true', help='不显示进度')
+    args = parser.parse_args(argv)
+
+    last_percent = [-1]
+
+    def progress(done, total):
+        percent = done * 100 // total if total else 100
+        if percent != last_percent[0]:
+            last_percent[0] = percent
+            print(f"\r已读取 {percent}%", end='', file=sys.stderr, flush=True)
+
+    try:
+        count, errors = importSchedule(args.source, args.target, args.replace,
+                                       None if args.quiet else progress,
+                                       profile=args.profile, term=args.term)
+    except (OSError, ValueError) as e:
+        print(f"导入课表时发生错误: {e}")
+        return 1
+    if not args.quiet:
+        print(file=sys.stderr)
+    print(f"已导入 {count} 门课程, {errors} 条记录有错误: {args.source} -> {args.target}")
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,207 @@
+import sys
+import json
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+
+
+# 解析后的课程：开始、结束为当天的分钟数，index 为课程在当天列表中的位置
+ParsedCourse = namedtuple('ParsedCourse', ['start', 'end', 'index', 'name'])
+
+
+class TimeFormatError(ValueError):
+    pass
+
+
+def parseClock(text):
+    parts = text.strip().split(':')
+    if len(parts) != 2 or not all(part.isdigit() for part in parts):
+        raise TimeFormatError(f"无效的时间: {text!r}")
+    hour, minute = int(parts[0]), int(parts[1])
+    if hour > 23 or minute > 59:
+        raise TimeFormatError(f"无效的时间: {text!r}")
+    return hour * 60 + minute
+
+
+def parseTimeRange(text):
+    # 把 "08:00-09:00" 解析为 (开始分钟, 结束分钟)，格式错误时抛出 TimeFormatError
+    if not isinstance(text, str):
+        raise TimeFormatError(f"无效的时间段: {text!r}")
+    parts = text.split('-')
+    if len(parts) != 2:
+        raise TimeFormatError(f"无效的时间段: {text!r}")
+    start, end = parseClock(parts[0]), parseClock(parts[1])
+    if end <= start:
+        raise TimeFormatError(f"结束时间早于开始时间: {text!r}")
+    return start, end
+
+
+def formatMinutes(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+class DayIndex:
+    def __init__(self, courses):
+        # 建立索引时的课程列表，页面据此判断索引是否对应正在显示的课程
+        self.records = courses
+        self.errors = []
+        parsed = []
+        for i, course in enumerate(courses):
+            # 课程记录创建时已解析好时间，这里只在格式错误时重新解析以取得错误信息
+            if course.start is None:
+                try:
+                    parseTimeRange(course.time)
+                except TimeFormatError as e:
+                    self.errors.append((i, str(e)))
+                continue
+            parsed.append(ParsedCourse(course.start, course.end, i, course.name))
+
+        # 按开始时间排序，用于查找下一节课
+        self.courses = sorted(parsed, key=lambda c: (c.start, c.index))
+        self.starts = [c.start for c in self.courses]
+        self._by_index = {c.index: c for c in parsed}
+
+        # 把一天切分为若干段，每段内正在上的课程集合不变，查询时二分定位
+        self.boundaries = sorted({c.start for c in parsed} | {c.end for c in parsed})
+        starting, ending = {}, {}
+        for c in parsed:
+            starting.setdefault(c.start, []).append(c.index)
+            ending.setdefault(c.end, []).append(c.index)
+        active = set()
+        self._segments = []
+        for boundary in self.boundaries:
+            active.difference_update(ending.get(boundary, ()))
+            active.update(starting.get(boundary, ()))
+            self._segments.append(tuple(sorted(active)))
+
+        # 按开始时间扫描一遍，找出时间相互重叠的课程组
+        self.conflicts = []
+        group, group_end = [], None
+        for c in self.courses:
+            if group and c.start < group_end:
+                group.append(c.index)
+                group_end = max(group_end, c.end)
+                continue
+            if len(group) > 1:
+                self.conflicts.append(tuple(group))
+            group, group_end = [c.index], c.end
+        if len(group) > 1:
+            self.conflicts.append(tuple(group))
+
+    def overlapping(self, start, end, exclude=None):
+        # 返回与 [start, end) 时间重叠的课程位置，只检查与该时间段相交的分段
+        first = max(bisect_right(self.boundaries, start) - 1, 0)
+        last = bisect_left(self.boundaries, end)
+        found = set()
+        for segment in self._segments[first:last]:
+            found.update(segment)
+        found.discard(exclude)
+        return sorted(found, key=lambda i: (self._by_index[i].start, i))
+
+    def sortedIndices(self):
+        # 按开始时间排列的课程位置，时间格式错误的课程排在最后
+        return [c.index for c in self.courses] + [i for i, _ in self.errors]
+
+    def course(self, index):
+        return self._by_index.get(index)
+
+    def currentIndices(self, minute):
+        # 返回正在上课的课程在当天列表中的位置
+        i = bisect_right(self.boundaries, minute) - 1
+        if i < 0:
+            return ()
+        return self._segments[i]
+
+    def currentCourse(self, minute):
+        indices = self.currentIndices(minute)
+        if not indices:
+            return None
+        return self._by_index[indices[0]]
+
+    def nextCourse(self, minute):
+        i = bisect_right(self.starts, minute)
+        if i >= len(self.courses):
+            return None
+        return self.courses[i]
+
+    def minutesUntilNext(self, minute):
+        course = self.nextCourse(minute)
+        if course is None:
+            return None
+        return course.start - minute
+
+
+EMPTY_DAY = DayIndex([])
+
+
+class ScheduleIndex:
+    # 整周课表的索引，课程数据变化时按天重建
+    def __init__(self, data=None):
+        self._days = {}
+        if data:
+            for weekday, courses in data.items():
+                if isinstance(courses, list):
+                    self.rebuild(weekday, courses)
+
+    def rebuild(self, weekday, courses):
+        index = DayIndex(courses)
+        self._days[str(weekday)] = index
+        for position, message in index.errors:
+            print(f"星期{weekday} 第{position + 1}节课时间格式错误: {message}")
+        return index
+
+    def day(self, weekday):
+        return self._days.get(str(weekday), EMPTY_DAY)
+
+
+def findConflicts(records):
+    # 批量检查整周课表，返回 [(星期, 重叠的课程位置)]，每天 O(n log n)
+    conflicts = []
+    for weekday in sorted(records, key=str):
+        if isinstance(records[weekday], list):
+            for group in DayIndex(records[weekday]).conflicts:
+                conflicts.append((str(weekday), group))
+    return conflicts
+
+
+def describeConflict(courses, group):
+    return '、'.join(f"{courses[i].name} {courses[i].time}" for i in group)
+
+
+def loadRecords(path):
+    from course_record import recordsFromData
+    with open(path, 'r', encoding='utf-8') as file:
+        return recordsFromData(json.load(file))[0]
+
+
+def main(argv):
+    # 命令行查询：python schedule_index.py [courses.json] [星期] [HH:MM]
+    # 检查时间重叠：python schedule_index.py --check [courses.json]
+    if len(argv) > 1 and argv[1] == '--check':
+        path = argv[2] if len(argv) > 2 else 'courses.json'
+        data = loadRecords(path)
+        conflicts = findConflicts(data)
+        for weekday, group in conflicts:
+            print(f"星期{weekday} 课程时间重叠: {describeConflict(data[weekday], group)}")
+        print(f"共发现 {len(conflicts)} 处时间重叠")
+        return 1 if conflicts else 0
+
+    from datetime import datetime
+    now = datetime.now()
+    path = argv[1] if len(argv) > 1 else 'courses.json'
+    weekday = int(argv[2]) if len(argv) > 2 else now.isoweekday()
+    minute = parseClock(argv[3]) if len(argv) > 3 else now.hour * 60 + now.minute
+
+    index = ScheduleIndex(loadRecords(path)).day(weekday)
+
+    current = index.currentCourse(minute)
+    upcoming = index.nextCourse(minute)
+    print(f"当前课程: {current.name if current else '无'}")
+    if upcoming is None:
+        print("今天没有更多课程")
+    else:
+        print(f"下一节: {upcoming.name} {formatMinutes(upcoming.start)}"
+              f"（{index.minutesUntilNext(minute)} 分钟后）")
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,278 @@
+import os
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+from schedule_index import ScheduleIndex
+from storage import openBackend
+from instrumentation import instrumented
+from io_worker import IoWorker
+from file_watcher import fileWatcher
+from course_record import recordsFromData, dataFromRecords
+
+
+class ScheduleStore(QObject):
+    # 课表文件被外部修改并重新加载后发出
+    scheduleChanged = pyqtSignal()
+    # 修改成功写入文件后发出，参数为这次保存写入的内存数据版本号
+    saved = pyqtSignal(int)
+
+    def __init__(self, path='courses.json', parent=None, debounce_ms=300,
+                 save_delay_ms=500, io_timeout_ms=5000, **backend_options):
+        super().__init__(parent)
+        # 存储后端：courses.json 或 SQLite 数据库，由文件扩展名决定
+        self.backend = openBackend(path, **backend_options)
+        self.path = self.backend.path
+        self._data = {}
+        # 每天课程 id 到位置的索引，按需建立
+        self._rows = {}
+        self._stamp = None
+        # 已修改但尚未写入文件的星期，以及正在后台写入的星期
+        self._dirty = set()
+        self._saving = set()
+        # 只需要补写课程 id 的星期，不算作本地修改，外部修改优先
+        self._missing_ids = set()
+        self._saving_ids = set()
+        # 保存进行中时收到的保存请求和文件检查推迟到保存结束后进行，
+        # 届时使用保存后的文件状态比较，不会把自己的保存当成外部修改
+        self._save_again = False
+        self._saving_revision = None
+        self._deferred_check = None
+        self._load_force = False
+        self.index = ScheduleIndex()
+        # 内存中课表数据的版本号，每次变化递增，供页面缓存判断是否过期
+        self.revision = 0
+
+        # 文件读写在后台线程中依次进行，超时后保留内存中的数据
+        self.io = IoWorker(self, max_threads=1)
+        self.io_timeout_ms = io_timeout_ms
+        self.io.finished.connect(self._onIoFinished)
+        self.io.failed.connect(self._onIoFailed)
+        self.io.timedOut.connect(self._onIoTimedOut)
+
+        # 文件变化通知去抖：编辑器保存时往往连续触发多次
+        self._reload_timer = QTimer(self)
+        self._reload_timer.setSingleShot(True)
+        self._reload_timer.setInterval(debounce_ms)
+        self._reload_timer.timeout.connect(self.checkForChanges)
+
+        # 延迟写入：连续的修改在空闲一段时间后合并为一次保存
+        self._save_timer = QTimer(self)
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(save_delay_ms)
+        self._save_timer.timeout.connect(self.save)
+
+        # 同时监视文件和所在目录，文件被删除或整体替换时也能收到通知
+        # 同一进程中的多个课表共用一个监视器
+        self.watcher = fileWatcher()
+        self._watchPaths()
+
+        self._load()
+
+    def _watchPaths(self):
+        self.watcher.watch(os.path.dirname(self.path), self._onPathChanged)
+        for path in self.backend.watchPaths():
+            self.watcher.watch(path, self._onPathChanged)
+
+    def _fileStamp(self):
+        return self.backend.stamp()
+
+    @instrumented('ScheduleStore.load')
+    def _readSchedule(self, known_stamp, force=False):
+        # 在工作线程中运行：文件未变化时返回 None
+        stamp = self._fileStamp()
+        if not force and stamp == known_stamp:
+            return None
+        data, recovered = self.backend.load()
+        return stamp, data, recovered
+
+    def _load(self):
+        # 启动时同步加载一次，之后的重新加载都在后台进行
+        try:
+            self._applyLoad(*self._readSchedule(None, force=True))
+        except OSError as e:
+            print(f"读取课程数据时发生错误: {e}")
+
+    def _applyLoad(self, stamp, data, recovered):
+        # 保留尚未写入的修改，重新加载后覆盖回去
+        pending = {weekday: self._data[weekday] for weekday in self._dirty | self._saving if weekday in self._data}
+        data, missing_ids = recordsFromData(data)
+        self._missing_ids = missing_ids - self._dirty - self._saving
+        if recovered:
+            # 尽快用恢复的数据修复主文件
+            self._dirty.update(data.keys())
+        if self._missing_ids or recovered:
+            # 新分配的课程 id 也尽快写回文件，重新加载后 id 保持不变
+            self._save_timer.start()
+        data.update(pending)
+        self._data = data
+        self._rows = {}
+        self._stamp = stamp
+        self.revision += 1
+        # 加载时一次性解析所有时间，格式错误在此报告
+        self.index = ScheduleIndex(self._data)
+
+    def _onPathChanged(self, path):
+        # 文件被替换后监视会失效，需要重新添加
+        self._watchPaths()
+        self._reload_timer.start()
+
+    def checkForChanges(self, force=False):
+        # 在后台比较修改时间或大小，确实变化时才重新解析；force 时总是重新读取
+        if self.io.isPending('save'):
+            self._deferCheck(force)
+            return
+        # 与排队中的检查合并时保留 force
+        self._load_force = force or (self._load_force and self.io.isPending('load'))
+        self.io.submit('load', self._readSchedule, self._stamp, self._load_force, timeout_ms=self.io_timeout_ms)
+
+    def _deferCheck(self, force):
+        self._deferred_check = force or bool(self._deferred_check)
+
+    def courses(self, weekday):
+        # 课程记录不可变，只需复制列表
+        return list(self._data.get(str(weekday), []))
+
+    def rowOf(self, weekday, course_id):
+        # 按 id 查找课程在当天列表中的位置，索引在当天数据变化后重建
+        weekday = str(weekday)
+        rows = self._rows.get(weekday)
+        if rows is None:
+            rows = self._rows[weekday] = {course.id: row for row, course in enumerate(self._data.get(weekday, []))}
+        return rows.get(course_id)
+
+    def dayIndex(self, weekday):
+        return self.index.day(weekday)
+
+    def hasPendingChanges(self):
+        return bool(self._dirty or self._saving)
+
+    def setCourses(self, weekday, courses):
+        self.setDays({weekday: courses})
+
+    def setDays(self, days):
+        # 一次修改多天的课程：版本号只递增一次，所有星期在同一次延迟保存中写入
+        # 外部尚未同步的修改在后台保存时合并，这里只修改内存数据
+        for weekday, courses in days.items():
+            weekday = str(weekday)
+            self._data[weekday] = list(courses)
+            self._rows.pop(weekday, None)
+            self.index.rebuild(weekday, self._data[weekday])
+            self._dirty.add(weekday)
+        self.revision += 1
+        self._save_timer.start()
+
+    def replaceSchedule(self, data):
+        # 用同步下来的整周课表替换内存数据，本地文件作为离线时使用的缓存在后台写入
+        # 返回替换后的数据版本号，saved 信号的版本号不小于它时同步的课表已写入文件
+        records, _ = recordsFromData(data)
+        for weekday in self._data:
+            records.setdefault(weekday, [])
+        self._data = records
+        self._rows = {}
+        self._dirty.update(records)
+        self._missing_ids = set()
+        self.revision += 1
+        self.index = ScheduleIndex(self._data)
+        revision = self.revision
+        self.save()
+        self.scheduleChanged.emit()
+        return revision
+
+    def flush(self):
+        # 退出前立即写入所有尚未保存的修改，并等待后台任务结束
+        # 保存时会合并外部修改，排队中的重新加载可以直接取消
+        self.io.cancel('load')
+        self._deferred_check = None
+        if self._dirty or self._missing_ids:
+            self.save()
+        self.io.waitForIdle(self.io_timeout_ms * 2)
+
+    def waitForIdle(self, timeout_ms=-1):
+        return self.io.waitForIdle(timeout_ms)
+
+    @instrumented('ScheduleStore.save')
+    def _writeSchedule(self, data, weekdays, id_weekdays, known_stamp):
+        # 在工作线程中运行：文件在上次读取后被外部修改时，先合并外部修改再写入
+        # 只补写 id 的星期在这种情况下以外部修改为准，重新加载后会再次分配 id
+        data = dataFromRecords(data)
+        merged = None
+        if self._fileStamp() != known_stamp:
+            merged, _ = self.backend.load()
+            for weekday in weekdays:
+                merged[weekday] = data.get(weekday, [])
+            data = merged
+        else:
+            weekdays = sorted(set(weekdays) | set(id_weekdays))
+        if weekdays:
+            self.backend.save(data, weekdays)
+        return self._fileStamp(), merged
+
+    def save(self):
+        self._save_timer.stop()
+        if self.io.isPending('save'):
+            # 上一次保存写入后再保存，比较时使用它写入后的文件状态
+            self._save_again = True
+            return
+        # 排队中的检查使用的是保存前的文件状态，取消后在保存结束时重新检查
+        if self.io.cancel('load'):
+            self._deferCheck(self._load_force)
+        # 每天的课程列表只会被整体替换，课程记录不可变，浅拷贝即可安全地交给工作线程
+        self._saving |= self._dirty
+        self._dirty.clear()
+        self._saving_ids |= self._missing_ids
+        self._missing_ids = set()
+        self._saving_revision = self.revision
+        self.io.submit('save', self._writeSchedule, dict(self._data), sorted(self._saving),
+                       sorted(self._saving_ids), self._stamp, timeout_ms=self.io_timeout_ms)
+
+    def _onIoFinished(self, key, result):
+        if key == 'load':
+            if result is None:
+                return
+            self._applyLoad(*result)
+            self.scheduleChanged.emit()
+        elif key == 'save':
+            stamp, merged = result
+            self._saving.clear()
+            self._saving_ids.clear()
+            # 记录自己写入后的文件状态，避免把自己的保存当成外部修改
+            self._stamp = stamp
+            self._watchPaths()
+            self.saved.emit(self._saving_revision)
+            if merged is not None:
+                self._applyLoad(stamp, merged, False)
+                self.scheduleChanged.emit()
+            self._afterSave()
+
+    def _afterSave(self):
+        # 运行保存期间推迟的保存和文件检查
+        if self._save_again:
+            self._save_again = False
+            if self._dirty or self._missing_ids:
+                self.save()
+                return
+        if self._deferred_check is not None:
+            force, self._deferred_check = self._deferred_check, None
+            self.checkForChanges(force)
+
+    def _onIoFailed(self, key, error):
+        if key == 'load':
+            print(f"读取课程数据时发生错误: {error}")
+        elif key == 'save':
+            print(f"保存课程数据时发生错误: {error}")
+            self._restoreDirty()
+            self._afterSave()
+
+    def _onIoTimedOut(self, key):
+        # 超时后继续使用内存中最后一份完好的数据，保存失败的星期稍后重试
+        print(f"课程数据{'读取' if key == 'load' else '保存'}超时: {self.path}")
+        if key == 'save':
+            self._restoreDirty()
+            self._afterSave()
+
+    def _restoreDirty(self):
+        # 失败的修改由延迟保存重试，不再立即重新保存
+        self._save_again = False
+        self._dirty |= self._saving
+        self._saving.clear()
+        self._missing_ids |= self._saving_ids
+        self._saving_ids.clear()
+        self._save_timer.start()
@@ -0,0 +1,242 @@
+import os
+import sys
+import json
+import argparse
+import http.client
+from urllib.parse import urlsplit
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+from io_worker import IoWorker
+from storage import openBackend
+from course_record import recordsFromData, dataFromRecords
+
+
+class HttpSource:
+    # 在工作线程中使用：保持一个长连接，连续的请求复用同一个 TCP 连接
+    def __init__(self, url, timeout=10):
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise ValueError(f"无效的同步地址: {url}")
+        self.url = url
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.path = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+        self.timeout = timeout
+        self.connection = None
+        # 建立连接的次数，长连接正常复用时保持为 1；解析课表的次数，304 时不增加
+        self.connects = 0
+        self.parses = 0
+
+    def _connect(self):
+        self.connects += 1
+        if self.scheme == 'https':
+            return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def get(self, headers):
+        # 返回 (状态码, 响应内容, 响应头)
+        for attempt in range(2):
+            reused = self.connection is not None
+            if self.connection is None:
+                self.connection = self._connect()
+            try:
+                self.connection.request('GET', self.path, headers=headers)
+                response = self.connection.getresponse()
+                body = response.read()
+            except (ConnectionError, http.client.BadStatusLine):
+                self.close()
+                # 服务器关闭了空闲的长连接时重新连接一次
+                if reused and attempt == 0:
+                    continue
+                raise
+            except (OSError, http.client.HTTPException):
+                self.close()
+                raise
+            if response.will_close:
+                self.close()
+            return response.status, body, response.headers
+
+    def fetch(self, etag=None, last_modified=None):
+        # 条件请求：课表未变化时服务器返回 304，返回 None 且不解析
+        # 有变化时返回 (数据, ETag, Last-Modified)
+        headers = {'Accept': 'application/json'}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        status, body, response_headers = self.get(headers)
+        if status == 304:
+            return None
+        if status != 200:
+            raise OSError(f"HTTP {status}: {self.url}")
+        self.parses += 1
+        data = json.loads(body.decode('utf-8'))
+        if not isinstance(data, dict):
+            raise ValueError("课程数据格式错误")
+        return data, response_headers.get('ETag'), response_headers.get('Last-Modified')
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+def metaPath(schedule_path):
+    return f"{schedule_path}.sync"
+
+
+def readMeta(path, url):
+    # 上次同步的 ETag 和 Last-Modified，同步地址变化后作废
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            meta = json.load(file)
+    except (OSError, ValueError):
+        return None, None
+    if not isinstance(meta, dict) or meta.get('url') != url:
+        return None, None
+    return meta.get('etag'), meta.get('last_modified')
+
+
+def writeMeta(path, url, etag, last_modified):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump({'url': url, 'etag': etag, 'last_modified': last_modified}, file)
+
+
+class ScheduleSync(QObject):
+    # 定期从 HTTP 地址拉取课表，写入本地课表文件；本地文件同时是服务器不可用时的缓存
+    # 同步模式下以服务器上的课表为准
+    # 每次同步结束后发出，参数为课表是否有变化
+    synced = pyqtSignal(bool)
+
+    def __init__(self, url, store, parent=None, interval_ms=5 * 60 * 1000, retry_ms=10 * 1000,
+                 max_backoff_ms=30 * 60 * 1000, timeout=10):
+        super().__init__(parent)
+        self.url = url
+        self.store = store
+        self.source = HttpSource(url, timeout)
+        self.interval_ms = interval_ms
+        self.retry_ms = retry_ms
+        self.max_backoff_ms = max_backoff_ms
+        self.meta_path = metaPath(store.path)
+        self.etag, self.last_modified = readMeta(self.meta_path, url)
+        # 课表写入本地文件后才记录新的 ETag，避免缓存没写成功却被认为已是最新
+        # 记下替换后的数据版本号，只有写入了这个版本的保存才算数
+        self._pending_meta = None
+        # 连续失败次数，决定下一次重试的等待时间
+        self.failures = 0
+        self.requests = 0
+        self.not_modified = 0
+        self.updates = 0
+
+        # 请求在单独的线程中依次进行，长连接只在这个线程中使用
+        self.io = IoWorker(self, max_threads=1)
+        self.io_timeout_ms = timeout * 2 * 1000
+        self.io.finished.connect(self._onIoFinished)
+        self.io.failed.connect(self._onIoFailed)
+        self.io.timedOut.connect(self._onIoTimedOut)
+        self.store.saved.connect(self._onStoreSaved)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.fetchNow)
+
+    def start(self):
+        self.fetchNow()
+
+    def stop(self):
+        self._timer.stop()
+        self.io.cancel('fetch')
+
+    def fetchNow(self):
+        self._timer.stop()
+        self.requests += 1
+        self.io.submit('fetch', self.source.fetch, self.etag, self.last_modified, timeout_ms=self.io_timeout_ms)
+
+    def nextDelay(self):
+        # 失败后按指数退避重试，成功后恢复正常间隔
+        if not self.failures:
+            return self.interval_ms
+        return min(self.retry_ms * 2 ** (self.failures - 1), self.max_backoff_ms)
+
+    def _scheduleNext(self):
+        self._timer.start(self.nextDelay())
+
+    def _onIoFinished(self, key, result):
+        if key == 'fetch':
+            self.failures = 0
+            if result is None:
+                self.not_modified += 1
+            else:
+                data, etag, last_modified = result
+                self.updates += 1
+                self._pending_meta = (etag, last_modified, self.store.replaceSchedule(data))
+            self._scheduleNext()
+            self.synced.emit(result is not None)
+
+    def _onStoreSaved(self, revision):
+        # 替换课表时正在进行的保存写入的是旧数据，等之后的保存写入同步下来的课表
+        if self._pending_meta is None or revision < self._pending_meta[2]:
+            return
+        self.etag, self.last_modified, _ = self._pending_meta
+        self._pending_meta = None
+        self.io.submit('meta', writeMeta, self.meta_path, self.url, self.etag, self.last_modified)
+
+    def _onIoFailed(self, key, error):
+        if key == 'fetch':
+            self._onFetchFailed(f"同步课表时发生错误: {error}")
+        else:
+            print(f"保存同步状态时发生错误: {error}")
+
+    def _onIoTimedOut(self, key):
+        if key == 'fetch':
+            self._onFetchFailed(f"同步课表超时: {self.url}")
+
+    def _onFetchFailed(self, message):
+        # 继续使用本地缓存的课表，稍后重试
+        self.failures += 1
+        print(message)
+        self._scheduleNext()
+
+
+def syncOnce(url, target='courses.json', timeout=10, **backend_options):
+    # 不启动界面，做一次条件请求并写入课表文件；返回课表是否有变化
+    path = metaPath(os.path.abspath(target))
+    etag, last_modified = readMeta(path, url)
+    source = HttpSource(url, timeout)
+    try:
+        result = source.fetch(etag, last_modified)
+    finally:
+        source.close()
+    if result is None:
+        return False
+    data, etag, last_modified = result
+    records, _ = recordsFromData(data)
+    backend = openBackend(target, **backend_options)
+    try:
+        backend.save(dataFromRecords(records), sorted(records))
+    finally:
+        backend.close()
+    writeMeta(path, url, etag, last_modified)
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='从 HTTP 地址同步课表到本地课表文件')
+    parser.add_argument('url', help='课表 JSON 的地址')
+    parser.add_argument('--target', default='courses.json', help='课表文件，.db 为 SQLite 数据库')
+    parser.add_argument('--timeout', type=float, default=10, help='请求超时秒数')
+    parser.add_argument('--profile', default='default')
+    parser.add_argument('--term', default='default')
+    args = parser.parse_args(argv)
+
+    try:
+        changed = syncOnce(args.url, args.target, args.timeout, profile=args.profile, term=args.term)
+    except (OSError, ValueError, http.client.HTTPException) as e:
+        print(f"同步课表时发生错误: {e}")
+        return 1
+    print(f"课表已更新: {args.target}" if changed else "课表没有变化")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,124 @@
+import os
+import sys
+import time
+import getpass
+import hashlib
+import argparse
+from PyQt5.QtCore import QObject, QLockFile, QDir, QCoreApplication, pyqtSignal
+from PyQt5.QtNetwork import QLocalServer, QLocalSocket
+
+# 第二次启动时可以转发给正在运行的实例的命令
+COMMANDS = ('show', 'reload', 'edit', 'display')
+# 已有实例还在启动、尚未开始监听时，重试连接的总时长
+CONNECT_RETRY_MS = 3000
+
+
+def serverName(directory=None):
+    # 同一用户、同一程序目录只运行一个实例，不同目录的课表互不影响
+    directory = os.path.abspath(directory or '.')
+    digest = hashlib.md5(f"{getpass.getuser()}|{directory}".encode('utf-8')).hexdigest()[:12]
+    return f"CourseSchedule-{digest}"
+
+
+def sendCommand(command, name=None, timeout_ms=1000, retry_ms=0):
+    # 把命令发送给正在运行的实例，返回实例的回复，没有实例时返回 None
+    name = name or serverName()
+    deadline = time.monotonic() + retry_ms / 1000
+    socket = QLocalSocket()
+    while True:
+        socket.connectToServer(name)
+        if socket.waitForConnected(timeout_ms):
+            break
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(0.1)
+    socket.write(f"{command}\n".encode('utf-8'))
+    socket.waitForBytesWritten(timeout_ms)
+    reply = None
+    if socket.waitForReadyRead(timeout_ms):
+        reply = bytes(socket.readLine()).decode('utf-8', errors='replace').strip()
+    socket.disconnectFromServer()
+    return reply
+
+
+class InstanceServer(QObject):
+    # 第二次启动的进程通过本地套接字发来的命令
+    commandReceived = pyqtSignal(str)
+
+    def __init__(self, name=None, parent=None):
+        super().__init__(parent)
+        self.name = name or serverName()
+        # 锁文件保证只有一个实例监听，进程意外退出后由锁文件自动判定失效
+        self._lock = QLockFile(os.path.join(QDir.tempPath(), f"{self.name}.lock"))
+        self._lock.setStaleLockTime(0)
+        self._server = None
+        self._buffers = {}
+
+    def tryLock(self):
+        # 返回 False 表示已有实例在运行；锁文件无法创建时不阻止启动
+        if self._lock.tryLock(0):
+            return True
+        if self._lock.error() != QLockFile.LockFailedError:
+            print(f"创建单实例锁文件时发生错误: {self._lock.error()}")
+            return True
+        return False
+
+    def listen(self):
+        # 上次异常退出可能留下套接字文件，已持有锁时可以直接删除
+        QLocalServer.removeServer(self.name)
+        self._server = QLocalServer(self)
+        self._server.setSocketOptions(QLocalServer.UserAccessOption)
+        self._server.newConnection.connect(self._onNewConnection)
+        if not self._server.listen(self.name):
+            print(f"监听本地命令时发生错误: {self._server.errorString()}")
+            return False
+        return True
+
+    def close(self):
+        if self._server is not None:
+            self._server.close()
+        self._lock.unlock()
+
+    def _onNewConnection(self):
+        while self._server.hasPendingConnections():
+            socket = self._server.nextPendingConnection()
+            self._buffers[socket] = b''
+            socket.readyRead.connect(lambda socket=socket: self._onReadyRead(socket))
+            socket.disconnected.connect(lambda socket=socket: self._onDisconnected(socket))
+
+    def _onReadyRead(self, socket):
+        data = self._buffers.get(socket, b'') + bytes(socket.readAll())
+        *lines, self._buffers[socket] = data.split(b'\n')
+        for line in lines:
+            command = line.decode('utf-8', errors='replace').strip()
+            if command in COMMANDS:
+                self.commandReceived.emit(command)
+                socket.write(b'ok\n')
+            else:
+                socket.write(b'unknown\n')
+
+    def _onDisconnected(self, socket):
+        self._buffers.pop(socket, None)
+        socket.deleteLater()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='向正在运行的课表程序发送命令')
+    parser.add_argument('command', choices=COMMANDS,
+                        help='show 显示窗口, reload 重新加载课表, edit 切换到编辑模式, display 切换到显示模式')
+    parser.add_argument('--dir', default='.', help='课表程序所在目录')
+    args = parser.parse_args(argv)
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+    reply = sendCommand(args.command, serverName(args.dir))
+    if reply is None:
+        print(f"没有正在运行的课表程序: {os.path.abspath(args.dir)}")
+        return 1
+    if reply != 'ok':
+        print(f"命令未被执行: {reply}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,21 @@
+import time
+
+
+class StartupProfile:
+    # 记录启动各阶段的耗时，用于 --profile-startup
+    def __init__(self, start=None):
+        self.start = start if start is not None else time.perf_counter()
+        self.last = self.start
+        self.phases = []
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def report(self):
+        lines = ['启动耗时分析:']
+        for phase, elapsed in self.phases:
+            lines.append(f"  {phase:<16} {elapsed * 1000:8.1f} ms")
+        lines.append(f"  {'total':<16} {(self.last - self.start) * 1000:8.1f} ms")
+        return '\n'.join(lines)
@@ -0,0 +1,319 @@
+import os
+import sys
+import json
+import shutil
+import sqlite3
+import argparse
+import tempfile
+from instrumentation import count
+from course_record import recordsFromData, dataFromRecords, increasingRun
+
+
+class JsonBackend:
+    # courses.json 存储：整周数据保存在一个 JSON 文件中
+    def __init__(self, path, backups=2, fsync=True):
+        self.path = os.path.abspath(path)
+        self.backups = backups
+        self.fsync = fsync
+
+    def watchPaths(self):
+        return [self.path]
+
+    def stamp(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def backupPath(self, number):
+        return f"{self.path}.bak{number}"
+
+    def _readJson(self, path):
+        with open(path, 'r', encoding='utf-8') as file:
+            data = json.load(file)
+            count('bytes_read', file.buffer.tell())
+        if not isinstance(data, dict):
+            raise ValueError("课程数据格式错误")
+        return data
+
+    def load(self):
+        # 返回 (数据, 是否从备份恢复)，文件不存在时返回空数据
+        if self.stamp() is None:
+            return {}, False
+        try:
+            return self._readJson(self.path), False
+        except (json.JSONDecodeError, ValueError) as e:
+            print(f"JSON解码错误: {e}")
+        for number in range(1, self.backups + 1):
+            backup = self.backupPath(number)
+            try:
+                data = self._readJson(backup)
+            except (OSError, ValueError):
+                continue
+            print(f"已从备份恢复课程数据: {backup}")
+            return data, True
+        return {}, False
+
+    def save(self, data, weekdays):
+        # 先写临时文件再原子替换，写入中途崩溃不会损坏原文件
+        directory = os.path.dirname(self.path)
+        fd, temp_path = tempfile.mkstemp(prefix='.courses-', suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as file:
+                json.dump(data, file, ensure_ascii=False, indent=4)
+                file.flush()
+                count('bytes_written', file.buffer.tell())
+                if self.fsync:
+                    os.fsync(file.fileno())
+            os.replace(temp_path, self.path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self._rotateBackups()
+
+    def _rotateBackups(self):
+        # 刚写入成功的主文件就是最后一份完好的数据，复制为最新备份
+        if self.backups <= 0:
+            return
+        for number in range(self.backups, 1, -1):
+            older = self.backupPath(number - 1)
+            if os.path.exists(older):
+                os.replace(older, self.backupPath(number))
+        shutil.copy2(self.path, self.backupPath(1))
+
+    def close(self):
+        pass
+
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS profiles (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS terms (
+    id INTEGER PRIMARY KEY,
+    profile_id INTEGER NOT NULL REFERENCES profiles(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    UNIQUE (profile_id, name)
+);
+CREATE TABLE IF NOT EXISTS weekdays (
+    id INTEGER PRIMARY KEY CHECK (id BETWEEN 1 AND 7),
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS courses (
+    id INTEGER PRIMARY KEY,
+    term_id INTEGER NOT NULL REFERENCES terms(id) ON DELETE CASCADE,
+    weekday INTEGER NOT NULL REFERENCES weekdays(id),
+    seq INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    time TEXT NOT NULL,
+    position INTEGER,
+    uid INTEGER
+);
+-- seq 只表示当天的先后顺序，可以不连续，插入课程时取前后两行之间的值
+DROP INDEX IF EXISTS idx_courses_day;
+CREATE INDEX IF NOT EXISTS idx_courses_order ON courses (term_id, weekday, seq);
+'''
+
+WEEKDAY_NAMES = ['星期一', '星期二', '星期三', '星期四', '星期五', '星期六', '星期日']
+# 新写入的课程之间 seq 的间隔，之后在中间插入课程时不需要移动其他行
+SEQ_GAP = 1024
+
+
+class SqliteBackend:
+    # SQLite 存储：按班级(profile)和学期(term)区分多套课表
+    def __init__(self, path, profile='default', term='default'):
+        self.path = os.path.abspath(path)
+        self.profile = profile
+        self.term = term
+        # 连接在后台线程中使用，由存储层保证同一时间只有一个任务访问
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        # WAL 模式下其他进程读取时不会阻塞本进程写入
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('PRAGMA foreign_keys=ON')
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+            self.conn.executemany('INSERT OR IGNORE INTO weekdays (id, name) VALUES (?, ?)',
+                                  enumerate(WEEKDAY_NAMES, start=1))
+            # 旧数据库没有课程 id 列
+            columns = [row[1] for row in self.conn.execute('PRAGMA table_info(courses)')]
+            if 'uid' not in columns:
+                self.conn.execute('ALTER TABLE courses ADD COLUMN uid INTEGER')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_courses_uid ON courses (term_id, uid)')
+        self.term_id = self._termId(profile, term)
+
+    def _termId(self, profile, term):
+        with self.conn:
+            self.conn.execute('INSERT OR IGNORE INTO profiles (name) VALUES (?)', (profile,))
+            profile_id = self.conn.execute('SELECT id FROM profiles WHERE name = ?', (profile,)).fetchone()[0]
+            self.conn.execute('INSERT OR IGNORE INTO terms (profile_id, name) VALUES (?, ?)', (profile_id, term))
+            return self.conn.execute('SELECT id FROM terms WHERE profile_id = ? AND name = ?',
+                                     (profile_id, term)).fetchone()[0]
+
+    def watchPaths(self):
+        return [self.path, self.path + '-wal']
+
+    def stamp(self):
+        # data_version 只在其他连接提交修改后变化
+        return self.conn.execute('PRAGMA data_version').fetchone()[0]
+
+    def load(self):
+        data = {}
+        rows = self.conn.execute(
+            'SELECT weekday, name, time, position, uid FROM courses WHERE term_id = ? ORDER BY weekday, seq, id',
+            (self.term_id,))
+        for weekday, name, time, position, uid in rows:
+            course = {'name': name, 'time': time}
+            if position is not None:
+                course['position'] = position
+            if uid is not None:
+                course['id'] = uid
+            data.setdefault(str(weekday), []).append(course)
+        return data, False
+
+    def save(self, data, weekdays):
+        # 只比较被修改的星期，按课程 id 对应已有的行，只更新有变化的课程
+        # 课程在这几天之间移动时更新原来的行，不会先删除再插入
+        weekdays = [int(weekday) for weekday in weekdays]
+        if not weekdays:
+            return
+        with self.conn:
+            existing = {}
+            stale = []
+            rows = self.conn.execute(
+                f"SELECT id, weekday, seq, name, time, position, uid FROM courses "
+                f"WHERE term_id = ? AND weekday IN ({', '.join('?' * len(weekdays))}) ORDER BY weekday, seq, id",
+                [self.term_id] + weekdays)
+            for row_id, weekday, seq, name, time, position, uid in rows:
+                # 没有 id 或 id 重复的旧数据行无法对应，删除后重新插入
+                if uid is None or uid in existing:
+                    stale.append(row_id)
+                else:
+                    existing[uid] = (row_id, (weekday, seq, name, time, position))
+            for weekday in weekdays:
+                self._saveDay(weekday, data.get(str(weekday), []), existing)
+            stale.extend(row_id for row_id, _ in existing.values())
+            self.conn.executemany('DELETE FROM courses WHERE id = ?', [(row_id,) for row_id in stale])
+
+    def _saveDay(self, weekday, courses, existing):
+        matched = [existing.pop(course.get('id'), None) for course in courses]
+        for course, match, seq in zip(courses, matched, self._sequence(weekday, matched)):
+            row = (weekday, seq, course['name'], course['time'], course.get('position'))
+            if match is None:
+                self.conn.execute(
+                    'INSERT INTO courses (term_id, weekday, seq, name, time, position, uid) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (self.term_id,) + row + (course.get('id'),))
+            elif match[1] != row:
+                self.conn.execute(
+                    'UPDATE courses SET weekday = ?, seq = ?, name = ?, time = ?, position = ? WHERE id = ?',
+                    row + (match[0],))
+
+    def _sequence(self, weekday, matched):
+        # 尽量保留已有行的 seq：顺序没有变化的最长一组课程不动，
+        # 其余课程取前后两行之间的值，没有空隙时整天重新编号
+        old = [match[1][1] if match is not None and match[1][0] == weekday else None for match in matched]
+        keep = increasingRun(old)
+        seqs = [old[i] if i in keep else None for i in range(len(old))]
+        i = 0
+        while i < len(seqs):
+            if seqs[i] is not None:
+                i += 1
+                continue
+            j = i
+            while j < len(seqs) and seqs[j] is None:
+                j += 1
+            low = seqs[i - 1] if i > 0 else None
+            high = seqs[j] if j < len(seqs) else None
+            count = j - i
+            if low is None and high is None:
+                new = [k * SEQ_GAP for k in range(count)]
+            elif high is None:
+                new = [low + (k + 1) * SEQ_GAP for k in range(count)]
+            elif low is None:
+                new = [high - (count - k) * SEQ_GAP for k in range(count)]
+            elif high - low > count:
+                new = [low + (high - low) * (k + 1) // (count + 1) for k in range(count)]
+            else:
+                return [k * SEQ_GAP for k in range(len(seqs))]
+            seqs[i:j] = new
+            i = j
+        return seqs
+
+    def close(self):
+        self.conn.close()
+
+
+def openBackend(path, **options):
+    # 按扩展名选择存储方式：.db/.sqlite 使用 SQLite，其余使用 JSON
+    if os.path.splitext(path)[1].lower() in ('.db', '.sqlite', '.sqlite3'):
+        return SqliteBackend(path, profile=options.get('profile', 'default'), term=options.get('term', 'default'))
+    return JsonBackend(path, backups=options.get('backups', 2), fsync=options.get('fsync', True))
+
+
+def readBackendOptions(path):
+    # 数据目录中的 schedule.txt 选择 SQLite 中的班级和学期，每行一项，例如:
+    #   profile=高一(3)班
+    #   term=2024秋
+    # 文件不存在时使用默认的班级和学期
+    options = {}
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            lines = file.read().splitlines()
+    except FileNotFoundError:
+        return options
+    except OSError as e:
+        print(f"读取{os.path.basename(path)}时发生错误: {e}")
+        return options
+    for line in lines:
+        key, _, value = line.partition('=')
+        key, value = key.strip(), value.strip()
+        if key in ('profile', 'term') and value:
+            options[key] = value
+    return options
+
+
+def migrate(json_path, db_path, profile='default', term='default'):
+    # 把现有的 courses.json 一次性导入 SQLite
+    # 导入时分配课程 id，之后的保存按 id 逐行更新
+    data, _ = JsonBackend(json_path).load()
+    data = dataFromRecords(recordsFromData(data)[0])
+    backend = SqliteBackend(db_path, profile, term)
+    try:
+        backend.save(data, [weekday for weekday in data if weekday.isdigit()])
+    finally:
+        backend.close()
+    return sum(len(courses) for courses in data.values())
+
+
+def export(db_path, json_path, profile='default', term='default'):
+    # 从 SQLite 导出为 courses.json 格式
+    backend = SqliteBackend(db_path, profile, term)
+    try:
+        data, _ = backend.load()
+    finally:
+        backend.close()
+    JsonBackend(json_path, backups=0).save(data, data.keys())
+    return sum(len(courses) for courses in data.values())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='课表存储迁移工具')
+    parser.add_argument('command', choices=['migrate', 'export'])
+    parser.add_argument('source')
+    parser.add_argument('target')
+    parser.add_argument('--profile', default='default')
+    parser.add_argument('--term', default='default')
+    args = parser.parse_args(argv)
+
+    if args.command == 'migrate':
+        count = migrate(args.source, args.target, args.profile, args.term)
+    else:
+        count = export(args.source, args.target, args.profile, args.term)
+    print(f"已处理 {count} 门课程: {args.source} -> {args.target}")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,110 @@
+from PyQt5.QtGui import QPainter, QPixmap, QColor, QPalette, QFontMetrics
+from PyQt5.QtCore import Qt, QRectF, QLineF
+from cached_view import CachedPixmapView
+from schedule_index import formatMinutes
+from instrumentation import instrumented
+
+WEEKDAY_NAMES = ['一', '二', '三', '四', '五', '六', '日']
+
+
+class WeekGridView(CachedPixmapView):
+    # 整周课表总览：七天并排的时间表，整体绘制在一张缓存的图片上
+    HEADER_HEIGHT = 24
+    # 没有课程时显示的默认时间范围（分钟）
+    DEFAULT_RANGE = (8 * 60, 18 * 60)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.index = None
+        self.revision = None
+        self.today = None
+        self.current = frozenset()
+
+    def setSchedule(self, index, revision):
+        # 直接使用存储层加载时解析好的整周索引，不再重新解析
+        if revision == self.revision:
+            return
+        self.index = index
+        self.revision = revision
+        self.invalidate()
+
+    def setCurrent(self, today, indices):
+        indices = frozenset(indices)
+        if today == self.today and indices == self.current:
+            return
+        self.today = today
+        self.current = indices
+        self.invalidate()
+
+    def timeRange(self):
+        starts, ends = [], []
+        for weekday in range(1, 8):
+            courses = self.index.day(weekday).courses if self.index is not None else []
+            starts.extend(course.start for course in courses)
+            ends.extend(course.end for course in courses)
+        if not starts:
+            return self.DEFAULT_RANGE
+        # 取整到整点，时间轴刻度更整齐
+        return min(starts) // 60 * 60, -(-max(ends) // 60) * 60
+
+    @instrumented('WeekGridView.render')
+    def renderPixmap(self, ratio):
+        pixmap = QPixmap(round(self.width() * ratio), round(self.height() * ratio))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.transparent)
+
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        palette = self.palette()
+        text_color = palette.color(QPalette.WindowText)
+        line_color = palette.color(QPalette.Mid)
+
+        first, last = self.timeRange()
+        top = self.HEADER_HEIGHT
+        axis_width = QFontMetrics(painter.font()).horizontalAdvance('00:00') + 8
+        column_width = (self.width() - axis_width) / 7
+        minute_height = (self.height() - top) / max(last - first, 1)
+
+        def y(minute):
+            return top + (minute - first) * minute_height
+
+        # 表头：星期，今天加粗显示
+        painter.setPen(text_color)
+        for day in range(7):
+            header = QRectF(axis_width + day * column_width, 0, column_width, top)
+            font = painter.font()
+            font.setBold(day + 1 == self.today)
+            painter.setFont(font)
+            painter.drawText(header, Qt.AlignCenter, WEEKDAY_NAMES[day])
+        font = painter.font()
+        font.setBold(False)
+        painter.setFont(font)
+
+        # 时间轴和整点横线，时间标在横线下方
+        for minute in range(first, last + 1, 60):
+            painter.setPen(line_color)
+            painter.drawLine(QLineF(axis_width, y(minute), self.width(), y(minute)))
+            if minute < last:
+                painter.setPen(text_color)
+                painter.drawText(QRectF(0, y(minute), axis_width - 4, 60 * minute_height),
+                                 Qt.AlignRight | Qt.AlignTop, formatMinutes(minute))
+
+        # 课程块，正在上的课程使用黄色
+        metrics = QFontMetrics(painter.font())
+        for day in range(7):
+            left = axis_width + day * column_width
+            painter.setPen(line_color)
+            painter.drawLine(QLineF(left, top, left, self.height()))
+            if self.index is None:
+                continue
+            for course in self.index.day(day + 1).courses:
+                rect = QRectF(left + 2, y(course.start) + 1, column_width - 4, (course.end - course.start) * minute_height - 2)
+                current = day + 1 == self.today and course.index in self.current
+                painter.setPen(line_color)
+                painter.setBrush(QColor('yellow') if current else palette.color(QPalette.AlternateBase))
+                painter.drawRoundedRect(rect, 3, 3)
+                painter.setPen(text_color)
+                name = metrics.elidedText(course.name, Qt.ElideRight, int(rect.width()) - 4)
+                painter.drawText(rect, Qt.AlignCenter, name)
+        painter.end()
+        return pixmap